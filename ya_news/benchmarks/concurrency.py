@@ -0,0 +1,88 @@
+"""
+Процессы для бенчмарка конкурентного доступа к SQLite.
+
+Процессы запускаются через spawn, поэтому модуль не трогает Django
+при импорте: базу данных нужно подменить до django.setup().
+"""
+import os
+import random
+import time
+
+# Настройки базы по умолчанию, без pragma и постоянных соединений.
+BARE_DATABASE = {'ENGINE': 'django.db.backends.sqlite3'}
+
+
+def setup_django(name, tuned):
+    """Настраивает Django на базу name: как в проекте или без настроек."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    from django.conf import settings
+    database = settings.DATABASES['default'] if tuned else BARE_DATABASE
+    settings.DATABASES = {'default': {**database, 'NAME': name}}
+    import django
+    django.setup()
+
+
+def prepare(name, tuned, news_count, users):
+    """Создаёт базу с новостями и пользователями для процессов."""
+    setup_django(name, tuned)
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from news.models import News
+    call_command('migrate', verbosity=0)
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст новости.')
+        for index in range(news_count)
+    )
+    get_user_model().objects.bulk_create(
+        get_user_model()(username=f'Читатель {index}')
+        for index in range(users)
+    )
+
+
+def run_traffic(name, tuned, seconds, write_share, seed, results):
+    """
+    Читает и комментирует новости, пока не выйдет время.
+
+    Чтение — запросы страницы новости, запись — комментарий вместе
+    со счётчиками новости. Каждая операция обёрнута в сигналы начала
+    и конца запроса, которые закрывают устаревшие соединения, как
+    при настоящем запросе. В results кладёт число чтений, записей
+    и ошибок.
+    """
+    setup_django(name, tuned)
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.signals import request_finished, request_started
+    from django.db import OperationalError, transaction
+
+    from news.models import Comment, News
+    generator = random.Random(seed)
+    news_ids = list(News.objects.values_list('pk', flat=True))
+    user_ids = list(get_user_model().objects.values_list('pk', flat=True))
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        news_id = generator.choice(news_ids)
+        write = generator.random() < write_share
+        request_started.send(sender=None)
+        try:
+            if write:
+                with transaction.atomic():
+                    Comment.objects.create(
+                        news_id=news_id,
+                        author_id=generator.choice(user_ids),
+                        text='Комментарий под нагрузкой',
+                    )
+            else:
+                News.objects.get(pk=news_id)
+                list(Comment.objects.filter(news_id=news_id).select_related(
+                    'author'
+                )[:settings.COMMENTS_COUNT_ON_DETAIL_PAGE])
+        except OperationalError:
+            counts['errors'] += 1
+        else:
+            counts['writes' if write else 'reads'] += 1
+        finally:
+            request_finished.send(sender=None)
+    results.put(counts)
@@ -0,0 +1,79 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+
+
+class Measurement:
+    """Результат одного замера: время, запросы к БД и пик памяти."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.peak_memory = 0
+
+    def time_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+
+
+@contextmanager
+def measure():
+    """Замеряет время, число SQL-запросов и пик выделенной памяти."""
+    result = Measurement()
+    tracemalloc.start()
+    started = time.perf_counter()
+    with (
+        CaptureQueriesContext(connection) as context,
+        connection.execute_wrapper(result.time_query),
+    ):
+        yield result
+    result.seconds = time.perf_counter() - started
+    result.queries = len(context.captured_queries)
+    result.peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+
+def explain(sql):
+    """Шаги плана SQLite для запроса: EXPLAIN QUERY PLAN."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def named_routes(namespaces, resolver=None, namespace=None):
+    """
+    Перечисляет именованные маршруты из заданных пространств имён.
+
+    Возвращает пары из полного имени вроде ``news:detail`` и имён
+    параметров маршрута.
+    """
+    for pattern in (resolver or get_resolver()).url_patterns:
+        if isinstance(pattern, URLResolver):
+            yield from named_routes(
+                namespaces, pattern, pattern.namespace or namespace
+            )
+        elif pattern.name and namespace in namespaces:
+            yield (
+                f'{namespace}:{pattern.name}',
+                tuple(pattern.pattern.converters),
+            )
+
+
+@pytest.fixture(autouse=True)
+def disable_slow_query_log(settings):
+    """Журнал медленных запросов не должен влиять на замеры."""
+    settings.NEWS_SLOW_QUERY_MS = None
+
+
+@pytest.fixture
+def author(django_user_model):
+    return django_user_model.objects.create(username='Автор комментария')
@@ -0,0 +1,79 @@
+"""
+Стоимость страниц архива новостей в начале и в конце таблицы.
+
+Запуск: pytest benchmarks/test_archive.py -s
+"""
+import time
+from datetime import date, timedelta
+
+import pytest
+from django.conf import settings
+from django.urls import reverse
+
+from news.models import News
+from news.pagination import KeysetPaginator
+from news.views import NewsArchive
+
+from .conftest import explain
+
+pytestmark = pytest.mark.django_db
+
+NEWS_COUNT = 500_000
+BATCH_SIZE = 10_000
+NEWS_PER_DAY = 7
+REPEAT = 20
+# Во сколько раз глубокая страница может быть медленнее первой.
+DEEP_PAGE_SLOWDOWN_LIMIT = 3
+
+
+def create_news(count):
+    first_day = date(2000, 1, 1)
+    News.objects.bulk_create(
+        (
+            News(
+                title=f'Новость {index}',
+                text='Текст',
+                date=first_day + timedelta(days=index // NEWS_PER_DAY),
+            )
+            for index in range(count)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+def timed(client, url, params):
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        response = client.get(url, params)
+    elapsed = (time.perf_counter() - started) / REPEAT
+    return response, elapsed
+
+
+def test_deep_archive_page_costs_as_much_as_first(client):
+    create_news(NEWS_COUNT)
+    url = reverse('news:archive')
+    paginator = KeysetPaginator(
+        News.objects.all(),
+        NewsArchive.ordering,
+        settings.NEWS_COUNT_ON_ARCHIVE_PAGE,
+    )
+    deep_news = News.objects.order_by('date', 'id')[
+        settings.NEWS_COUNT_ON_ARCHIVE_PAGE * 2
+    ]
+    deep_cursor = paginator.encode_cursor(deep_news)
+
+    first, first_time = timed(client, url, {})
+    deep, deep_time = timed(client, url, {'after': deep_cursor})
+
+    assert len(first.context['object_list']) == len(
+        deep.context['object_list']
+    )
+    page_query = str(paginator.get_page(deep_cursor).object_list.query)
+    plan = ' | '.join(explain(page_query))
+    print(
+        f'\n{NEWS_COUNT} новостей: первая страница '
+        f'{first_time * 1000:.2f} мс, глубокая {deep_time * 1000:.2f} мс'
+        f'\nплан: {plan}'
+    )
+    assert 'TEMP B-TREE' not in plan
+    assert deep_time <= first_time * DEEP_PAGE_SLOWDOWN_LIMIT
@@ -0,0 +1,105 @@
+"""
+Пропускная способность и p99 главной и страницы новости
+под WSGI (синхронные представления в потоках) и под ASGI
+(асинхронные представления в одном цикле событий).
+
+Оба обработчика запускаются в процессе, без сетевого сервера,
+поэтому сравнивается только стоимость самого Django.
+
+Запуск: pytest benchmarks/test_asgi.py -s
+"""
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.test import AsyncClient, Client, override_settings
+from django.urls import include, path, reverse
+
+from news import async_views
+from news import urls as news_urls
+from news.models import Comment, News
+from yanews.urls import auth_urls
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+REQUESTS = 400
+CONCURRENCY = 20
+COMMENTS = 200
+
+# Маршруты, которые включает NEWS_ASYNC_VIEWS под ASGI.
+urlpatterns = [
+    path('', include(([
+        path('', async_views.AsyncNewsList.as_view(), name='home'),
+        path(
+            'news/<int:pk>/',
+            async_views.AsyncNewsDetailView.as_view(),
+            name='detail',
+        ),
+        *news_urls.urlpatterns,
+    ], 'news'))),
+    path('auth/', include(auth_urls)),
+]
+
+
+def summary(mode, name, latencies, elapsed):
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f'\n{mode} {name}: {len(latencies) / elapsed:.0f} запросов/с, '
+        f'p50 {statistics.median(latencies) * 1000:.1f} мс, '
+        f'p99 {p99 * 1000:.1f} мс'
+    )
+
+
+def run_wsgi(url):
+    def fetch(_):
+        client = Client()
+        started = time.perf_counter()
+        response = client.get(url)
+        assert response.status_code == 200
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(CONCURRENCY) as executor:
+        latencies = list(executor.map(fetch, range(REQUESTS)))
+    return latencies, time.perf_counter() - started
+
+
+async def run_asgi(url):
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def fetch():
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(url)
+            assert response.status_code == 200
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(fetch() for _ in range(REQUESTS)))
+    return latencies, time.perf_counter() - started
+
+
+def test_wsgi_against_asgi(author):
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст новости ' * 20)
+        for index in range(50)
+    )
+    news = News.objects.first()
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for index in range(COMMENTS)
+    )
+    News.objects.filter(pk=news.pk).recount_comments()
+    routes = (
+        ('news:home', ()),
+        ('news:detail', (news.pk,)),
+    )
+    for name, args in routes:
+        url = reverse(name, args=args)
+        summary('WSGI', name, *run_wsgi(url))
+        with override_settings(ROOT_URLCONF=__name__):
+            summary('ASGI', name, *asyncio.run(run_asgi(url)))
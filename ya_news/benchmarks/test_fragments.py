@@ -0,0 +1,47 @@
+"""
+Выигрыш от кеша фрагментов на странице новости с тысячами комментариев.
+
+Запуск: pytest benchmarks/test_fragments.py -s
+"""
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from news.cache import fragment_stats, get_fragment_stats
+from news.models import Comment, News
+
+from .conftest import measure
+
+pytestmark = pytest.mark.django_db
+
+COMMENTS_PER_NEWS = 5_000
+TEXT = 'Строка комментария с переносом.\n' * 5
+
+
+def test_comment_fragments_pay_off(client, author, settings):
+    # Худший случай: весь тред на одной странице.
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = COMMENTS_PER_NEWS
+    news = News.objects.create(title='Популярная новость', text='Текст')
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'{index}. {TEXT}')
+        for index in range(COMMENTS_PER_NEWS)
+    )
+    News.objects.filter(pk=news.pk).recount_comments()
+    url = reverse('news:detail', args=(news.pk,))
+    cache.clear()
+    fragment_stats.clear()
+
+    with measure() as cold:
+        client.get(url)
+    with measure() as warm:
+        client.get(url)
+
+    stats = get_fragment_stats()['comment']
+    print(
+        f'\n{COMMENTS_PER_NEWS} комментариев: без кеша '
+        f'{cold.seconds * 1000:.0f} мс, из кеша {warm.seconds * 1000:.0f} мс'
+        f'\nпопадания {stats["hits"]}, промахи {stats["misses"]}, '
+        f'доля попаданий {stats["ratio"]:.2f}'
+    )
+    assert stats['hits'] == COMMENTS_PER_NEWS
+    assert warm.seconds < cold.seconds
@@ -0,0 +1,61 @@
+"""
+Стоимость главной страницы при росте числа комментариев.
+
+Запуск: pytest benchmarks/test_home.py -s
+"""
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+
+from news.models import Comment, News
+
+from .conftest import measure
+
+pytestmark = pytest.mark.django_db
+
+COMMENTS_PER_NEWS = (10, 1_000, 10_000, 100_000)
+BATCH_SIZE = 5_000
+# Допустимый рост пика памяти между самым маленьким и самым большим
+# набором данных.
+MEMORY_GROWTH_LIMIT = 1.5
+
+
+def add_comments(news, author, count):
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст')
+        for index in range(settings.NEWS_COUNT_ON_HOME_PAGE - 1)
+    )
+    Comment.objects.bulk_create(
+        (
+            Comment(news=news, author=author, text=f'Комментарий {index}')
+            for index in range(count)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    # bulk_create не отправляет сигналы, которые ведут счётчики.
+    News.objects.filter(pk=news.pk).recount_comments()
+
+
+def test_home_cost_does_not_depend_on_comments(client, author):
+    url = reverse('news:home')
+    results = []
+    for count in COMMENTS_PER_NEWS:
+        Comment.objects.all().delete()
+        News.objects.all().delete()
+        news = News.objects.create(title='Популярная новость', text='Текст')
+        add_comments(news, author, count)
+        client.get(url)
+        cache.clear()
+        with measure() as result:
+            response = client.get(url)
+        assert f'Комментариев: {count}' in response.content.decode()
+        results.append((count, result))
+        print(
+            f'\n{count:>7} комментариев: {result.queries} запросов, '
+            f'{result.seconds * 1000:.1f} мс, '
+            f'пик памяти {result.peak_memory / 1024:.0f} КиБ'
+        )
+    smallest, largest = results[0][1], results[-1][1]
+    assert largest.queries == smallest.queries
+    assert largest.peak_memory <= smallest.peak_memory * MEMORY_GROWTH_LIMIT
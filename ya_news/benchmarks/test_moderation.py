@@ -0,0 +1,61 @@
+"""
+Проверка комментария на запрещённые слова: цикл по словарю
+против одного выражения по префиксному дереву.
+
+Запуск: pytest benchmarks/test_moderation.py -s
+"""
+import random
+import time
+
+from news.moderation import compile_words
+
+LEXICON_SIZES = (10, 1_000, 50_000)
+COMMENT_WORDS = 2_000
+COMMENTS = 20
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+
+
+def make_words(generator, count):
+    return [
+        ''.join(generator.choices(ALPHABET, k=generator.randint(6, 14)))
+        for _ in range(count)
+    ]
+
+
+def loop_search(words, text):
+    """Прежняя проверка из CommentForm.clean_text."""
+    lowered_text = text.lower()
+    return any(word in lowered_text for word in words)
+
+
+def timed(function, comments):
+    started = time.perf_counter()
+    results = [function(comment) for comment in comments]
+    return (time.perf_counter() - started) / len(comments), results
+
+
+def test_compiled_matcher_against_loop():
+    generator = random.Random(0)
+    comments = [
+        ' '.join(make_words(generator, COMMENT_WORDS))
+        for _ in range(COMMENTS)
+    ]
+    for size in LEXICON_SIZES:
+        words = make_words(generator, size)
+        started = time.perf_counter()
+        pattern = compile_words(words)
+        build_time = time.perf_counter() - started
+
+        loop_time, expected = timed(
+            lambda text: loop_search(words, text), comments
+        )
+        regex_time, found = timed(
+            lambda text: pattern.search(text.lower()) is not None, comments
+        )
+
+        assert found == expected
+        print(
+            f'\n{size:>6} слов: цикл {loop_time * 1000:.2f} мс, '
+            f'выражение {regex_time * 1000:.2f} мс на комментарий '
+            f'(сборка {build_time * 1000:.0f} мс)'
+        )
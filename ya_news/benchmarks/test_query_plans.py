@@ -0,0 +1,99 @@
+"""
+Планы и время запросов каждой страницы на большом наборе данных.
+
+Падает, если запрос читает большую таблицу целиком или сортирует
+результат во временном B-дереве вместо чтения индекса по порядку.
+
+Запуск: pytest benchmarks/test_query_plans.py -s
+"""
+import random
+import re
+import time
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from news.models import Comment, News
+
+from .conftest import explain
+
+pytestmark = pytest.mark.django_db
+
+NEWS_COUNT = 100_000
+COMMENT_COUNT = 500_000
+HOT_NEWS_COMMENTS = 2_000
+BATCH_SIZE = 10_000
+BIG_TABLES = ('news_news', 'news_comment')
+FULL_SCAN = re.compile(rf'^SCAN ({"|".join(BIG_TABLES)})$')
+
+
+def create_dataset(author):
+    News.objects.bulk_create(
+        (
+            News(title=f'Новость {index}', text='Текст')
+            for index in range(NEWS_COUNT)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    first_id = News.objects.order_by('id').values_list('id', flat=True)[0]
+    hot_news = News.objects.get(id=first_id)
+    generator = random.Random(0)
+    Comment.objects.bulk_create(
+        (
+            Comment(
+                news_id=first_id + generator.randrange(NEWS_COUNT),
+                author=author,
+                text='Комментарий',
+            )
+            for _ in range(COMMENT_COUNT)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    Comment.objects.bulk_create(
+        (
+            Comment(news=hot_news, author=author, text='Комментарий')
+            for _ in range(HOT_NEWS_COMMENTS)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    return hot_news
+
+
+def test_views_use_indexes(author):
+    news = create_dataset(author)
+    cache.clear()
+    comment = Comment.objects.filter(news=news, author=author).first()
+    anonymous = Client()
+    author_client = Client()
+    author_client.force_login(author)
+    pages = (
+        ('news:home', anonymous, ()),
+        ('news:archive', anonymous, ()),
+        ('news:detail', anonymous, (news.pk,)),
+        ('news:detail', author_client, (news.pk,)),
+        ('news:comments', anonymous, (news.pk,)),
+        ('news:edit', author_client, (comment.pk,)),
+        ('news:delete', author_client, (comment.pk,)),
+    )
+    problems = []
+    for name, client, args in pages:
+        url = reverse(name, args=args)
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as context:
+            client.get(url)
+        elapsed = time.perf_counter() - started
+        print(f'\n{name} {url}: {elapsed * 1000:.1f} мс')
+        for query in context.captured_queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            plan = explain(query['sql'])
+            print(f'  {query["time"]} с: {query["sql"][:100]}')
+            for step in plan:
+                print(f'    {step}')
+                if FULL_SCAN.match(step) or 'TEMP B-TREE' in step:
+                    problems.append((name, step, query['sql']))
+    assert not problems
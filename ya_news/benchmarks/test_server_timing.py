@@ -0,0 +1,65 @@
+"""
+Накладные расходы замеров Server-Timing.
+
+Время зависит от машины и её загрузки, поэтому замедление только
+печатается. Проверяется лишь то, что запросы вне выборки проходят
+без заголовка.
+
+Запуск: pytest benchmarks/test_server_timing.py -s
+"""
+import time
+
+import pytest
+from django.test.client import Client
+from django.urls import reverse
+
+from news.models import Comment, News
+
+pytestmark = pytest.mark.django_db
+
+COMMENTS = 50
+REQUESTS = 200
+ROUNDS = 5
+MIDDLEWARE = 'news.timing.ServerTimingMiddleware'
+
+
+def best_time(client, url):
+    """
+    Лучшее время из нескольких прогонов серии запросов.
+
+    Здесь не нужен measure(): tracemalloc замедляет запросы сильнее,
+    чем сами замеры.
+    """
+    client.get(url)
+    rounds = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        for _ in range(REQUESTS):
+            client.get(url)
+        rounds.append(time.perf_counter() - started)
+    return min(rounds)
+
+
+def test_server_timing_overhead(settings, author):
+    news = News.objects.create(title='Новость', text='Текст')
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for index in range(COMMENTS)
+    )
+    client = Client()
+    client.force_login(author)
+    url = reverse('news:detail', args=(news.pk,))
+    plain = best_time(client, url)
+    settings.MIDDLEWARE = [MIDDLEWARE, *settings.MIDDLEWARE]
+    sampled = best_time(client, url)
+    settings.NEWS_TIMING_SAMPLE_RATE = 1.0
+    full = best_time(client, url)
+    settings.NEWS_TIMING_SAMPLE_RATE = 0
+    unsampled = client.get(url)
+    print(
+        f'\n{REQUESTS} запросов: без замеров {plain * 1000:.0f} мс, '
+        f'с выборкой {sampled * 1000:.0f} мс '
+        f'(×{sampled / plain:.2f}), '
+        f'все запросы {full * 1000:.0f} мс (×{full / plain:.2f})'
+    )
+    assert 'Server-Timing' not in unsampled
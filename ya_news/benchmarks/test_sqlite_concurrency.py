@@ -0,0 +1,66 @@
+"""
+Смешанная нагрузка на SQLite из нескольких процессов.
+
+Сравнивает базу без настроек (журнал отката, соединение на запрос)
+с настройками проекта (WAL, pragma, IMMEDIATE, постоянные соединения).
+Пропускная способность зависит от машины, поэтому прирост только
+печатается, а проверяется отсутствие ошибок под нагрузкой.
+
+Запуск: pytest benchmarks/test_sqlite_concurrency.py -s
+"""
+import multiprocessing
+
+from . import concurrency
+
+PROCESSES = 4
+SECONDS = 5
+WRITE_SHARE = 0.2
+NEWS_COUNT = 100
+USERS = 10
+
+
+def run(path, tuned):
+    context = multiprocessing.get_context('spawn')
+    name = str(path / f'{"tuned" if tuned else "bare"}.sqlite3')
+    process = context.Process(
+        target=concurrency.prepare, args=(name, tuned, NEWS_COUNT, USERS)
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    results = context.Queue()
+    workers = [
+        context.Process(
+            target=concurrency.run_traffic,
+            args=(name, tuned, SECONDS, WRITE_SHARE, seed, results),
+        )
+        for seed in range(PROCESSES)
+    ]
+    for worker in workers:
+        worker.start()
+    # Упавший процесс ничего не положит в очередь: ждём с запасом,
+    # а не бесконечно.
+    counts = [results.get(timeout=SECONDS * 10) for _ in workers]
+    for worker in workers:
+        worker.join()
+    assert all(worker.exitcode == 0 for worker in workers)
+    return {
+        key: sum(count[key] for count in counts)
+        for key in ('reads', 'writes', 'errors')
+    }
+
+
+def test_tuned_sqlite_has_no_errors_under_load(tmp_path):
+    bare = run(tmp_path, tuned=False)
+    tuned = run(tmp_path, tuned=True)
+    for title, result in (('Без настроек', bare), ('С настройками', tuned)):
+        print(
+            f'\n{title}: {result["reads"] / SECONDS:.0f} чтений/с, '
+            f'{result["writes"] / SECONDS:.0f} записей/с, '
+            f'{result["errors"]} ошибок'
+        )
+    speedup = (tuned['reads'] + tuned['writes']) / (
+        bare['reads'] + bare['writes']
+    )
+    print(f'С настройками операций ×{speedup:.2f}')
+    assert tuned['errors'] == 0
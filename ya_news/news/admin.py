@@ -1,11 +1,47 @@
 from django.contrib import admin
+from django.db.models import Subquery
+from django.forms.models import BaseInlineFormSet
 
 from .models import Comment, News
+from .pagination import CappedCountPaginator
+
+
+class LatestCommentsFormSet(BaseInlineFormSet):
+    """
+    Только последние комментарии новости.
+
+    У популярной новости комментариев может быть больше, чем
+    помещается на странице, поэтому в форму попадают последние
+    max_comments. Остальные правятся в списке комментариев.
+    """
+    max_comments = 20
+
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            queryset = super().get_queryset()
+            latest = queryset.order_by('-created', '-id').values('id')[
+                :self.max_comments
+            ]
+            self._queryset = queryset.filter(
+                id__in=Subquery(latest)
+            ).order_by('created', 'id')
+        return self._queryset
 
 
 class CommentInline(admin.StackedInline):
     model = Comment
+    formset = LatestCommentsFormSet
     extra = 0
+    fields = ('author', 'text', 'created')
+    # Автора показываем из select_related: виджет выбора пользователя
+    # делал бы отдельный запрос на каждую форму.
+    readonly_fields = ('author', 'created')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('author')
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(News)
@@ -13,3 +49,19 @@ class NewsAdmin(admin.ModelAdmin):
     inlines = [
         CommentInline,
     ]
+    list_display = ('title', 'date', 'comment_count')
+    paginator = CappedCountPaginator
+    # Без второго COUNT(*) по всей таблице.
+    show_full_result_count = False
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'news', 'author', 'created')
+    list_select_related = ('news', 'author')
+    raw_id_fields = ('news',)
+    autocomplete_fields = ('author',)
+    # Сортировка по первичному ключу не требует сортировать всю таблицу.
+    ordering = ('-id',)
+    paginator = CappedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,106 @@
+import time
+from collections import Counter
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .timing import record_cache
+
+CONTENT_VERSION_KEY = 'news:content-version'
+PAGE_KEY = 'news:page:{version}:{path}'
+
+# Попадания и промахи кеша фрагментов в текущем процессе.
+fragment_stats = Counter()
+
+
+def get_content_version():
+    """
+    Текущая версия содержимого новостей.
+
+    Если версия ещё не сохранена или вытеснена из кеша, начинаем
+    с текущего времени: так новая версия не совпадёт ни с одной из
+    тех, под которыми уже лежат страницы.
+    """
+    return cache.get_or_set(CONTENT_VERSION_KEY, time.time_ns, None)
+
+
+async def aget_content_version():
+    return await cache.aget_or_set(CONTENT_VERSION_KEY, time.time_ns, None)
+
+
+def bump_content_version():
+    """Делает устаревшими все страницы, закешированные ранее."""
+    cache.set(CONTENT_VERSION_KEY, time.time_ns(), None)
+
+
+def get_page_key(request, version):
+    return PAGE_KEY.format(version=version, path=request.get_full_path())
+
+
+def cache_anonymous_page(view):
+    """
+    Кеширует страницу целиком для анонимных пользователей.
+
+    Ключ содержит версию содержимого, поэтому после любой записи
+    новость или комментарий видны уже на следующем запросе.
+    Асинхронные представления обслуживаются асинхронным кешем.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return await view(request, *args, **kwargs)
+            key = get_page_key(request, await aget_content_version())
+            content = await cache.aget(key)
+            record_cache(content is not None)
+            if content is not None:
+                return HttpResponse(content)
+            response = await view(request, *args, **kwargs)
+            if response.status_code == 200:
+                await cache.aset(
+                    key, response.content, settings.NEWS_PAGE_CACHE_TIMEOUT
+                )
+            return response
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+        key = get_page_key(request, get_content_version())
+        content = cache.get(key)
+        record_cache(content is not None)
+        if content is not None:
+            return HttpResponse(content)
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda response: cache.set(
+                    key, response.content, settings.NEWS_PAGE_CACHE_TIMEOUT
+                )
+            )
+        return response
+    return wrapper
+
+
+def record_fragment(name, hit):
+    fragment_stats[name, 'hits' if hit else 'misses'] += 1
+    record_cache(hit)
+
+
+def get_fragment_stats():
+    """
+    Статистика кеша фрагментов по именам.
+
+    Пример: ``{'comment': {'hits': 990, 'misses': 10, 'ratio': 0.99}}``.
+    """
+    stats = {}
+    for (name, outcome), count in fragment_stats.items():
+        stats.setdefault(name, {'hits': 0, 'misses': 0})[outcome] = count
+    for counters in stats.values():
+        total = counters['hits'] + counters['misses']
+        counters['ratio'] = counters['hits'] / total if total else 0.0
+    return stats
@@ -0,0 +1,92 @@
+import hashlib
+from datetime import datetime, timezone
+
+from django.middleware.csrf import get_token
+
+from .cache import get_content_version
+from .models import News
+
+
+def _user_key(request):
+    """
+    Вариант страницы: анонимный или конкретного пользователя.
+
+    Авторизованным показываются имя и ссылки на свои комментарии,
+    поэтому их валидаторы не должны совпадать ни с анонимными,
+    ни с валидаторами других пользователей. В шапке у них ещё форма
+    выхода с CSRF-токеном, поэтому ключ зависит и от CSRF-cookie:
+    после нового входа cookie меняется, и старая страница с прежним
+    токеном не подойдёт.
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return 'anonymous'
+    # Cookie выставляется заранее: страница будет отрисована с ним же.
+    get_token(request)
+    csrf = hashlib.md5(request.META['CSRF_COOKIE'].encode()).hexdigest()
+    return f'user-{user.pk}-{csrf}'
+
+
+def _make_etag(request, *parts):
+    source = ':'.join(str(part) for part in (*parts, _user_key(request)))
+    return hashlib.md5(source.encode()).hexdigest()
+
+
+def _detail_states(pk):
+    return News.objects.filter(pk=pk).values(
+        'date', 'modified', 'comment_count', 'last_comment_at'
+    )
+
+
+def _detail_state(request, pk):
+    """Один запрос на оба валидатора страницы новости."""
+    if not hasattr(request, '_news_detail_state'):
+        request._news_detail_state = next(iter(_detail_states(pk)), None)
+    return request._news_detail_state
+
+
+async def aload_detail_state(request, pk):
+    """То же, что _detail_state, через асинхронный ORM."""
+    request._news_detail_state = None
+    async for state in _detail_states(pk):
+        request._news_detail_state = state
+
+
+def detail_etag(request, pk):
+    state = _detail_state(request, pk)
+    if state is None:
+        return None
+    return _make_etag(
+        request,
+        state['date'],
+        state['modified'].isoformat(),
+        state['comment_count'],
+        state['last_comment_at'] and state['last_comment_at'].isoformat(),
+    )
+
+
+def detail_last_modified(request, pk):
+    """
+    Время последнего изменения новости или её комментариев.
+
+    Отдаём только анонимам: у авторизованных время изменения
+    не отличает их вариант страницы от чужого, это делает ETag.
+    """
+    if request.user.is_authenticated:
+        return None
+    state = _detail_state(request, pk)
+    if state is None:
+        return None
+    return max(filter(None, (state['modified'], state['last_comment_at'])))
+
+
+def home_etag(request):
+    return _make_etag(request, get_content_version())
+
+
+def home_last_modified(request):
+    if request.user.is_authenticated:
+        return None
+    return datetime.fromtimestamp(
+        get_content_version() / 1e9, tz=timezone.utc
+    )
@@ -0,0 +1,74 @@
+import zlib
+
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+
+def decompress(value):
+    """Текст из значения колонки: сжатое значение хранится как BLOB."""
+    if isinstance(value, (bytes, memoryview)):
+        return zlib.decompress(value).decode()
+    return value
+
+
+class CompressedTextAttribute(DeferredAttribute):
+    """
+    Распаковывает текст при первом обращении к атрибуту.
+
+    Из базы в объект попадает значение как есть, поэтому запросы,
+    которые не трогают текст, ничего не распаковывают.
+    """
+
+    def __get__(self, instance, cls=None):
+        value = super().__get__(instance, cls)
+        if instance is None or not isinstance(value, (bytes, memoryview)):
+            return value
+        value = decompress(value)
+        instance.__dict__[self.field.attname] = value
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+class CompressedTextField(models.TextField):
+    """
+    Текстовое поле, которое сжимает длинные значения zlib.
+
+    Текст длиннее compress_above байт в UTF-8 хранится в той же колонке
+    как BLOB — SQLite допускает значения любого типа в колонке TEXT.
+    Короткий текст, а также текст, который не удалось сжать, хранится
+    как обычно. По сжатому тексту не работают LIKE и icontains.
+    """
+    descriptor_class = CompressedTextAttribute
+    non_db_attrs = (*models.TextField.non_db_attrs, 'compress_above')
+
+    def __init__(self, *args, compress_above=1024, **kwargs):
+        self.compress_above = compress_above
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['compress_above'] = self.compress_above
+        return name, path, args, kwargs
+
+    def to_python(self, value):
+        return super().to_python(decompress(value))
+
+    def pre_save(self, model_instance, add):
+        """Нетронутое сжатое значение сохраняется без распаковки."""
+        if self.attname in model_instance.__dict__:
+            return model_instance.__dict__[self.attname]
+        return super().pre_save(model_instance, add)
+
+    def get_prep_value(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return value
+        value = super().get_prep_value(value)
+        if value is None:
+            return value
+        encoded = value.encode()
+        if len(encoded) <= self.compress_above:
+            return value
+        compressed = zlib.compress(encoded)
+        return compressed if len(compressed) < len(encoded) else value
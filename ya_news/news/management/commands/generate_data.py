@@ -0,0 +1,174 @@
+import itertools
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from news.cache import bump_content_version
+from news.models import Comment, News
+
+WORDS = (
+    'город', 'новость', 'сегодня', 'вчера', 'жители', 'погода', 'мост',
+    'парк', 'школа', 'дорога', 'праздник', 'концерт', 'выставка', 'матч',
+    'команда', 'победа', 'открытие', 'ремонт', 'автобус', 'метро', 'цены',
+    'рынок', 'театр', 'музей', 'фестиваль', 'снег', 'дождь', 'лето',
+    'зима', 'весна', 'осень', 'решение', 'проект', 'строительство',
+)
+# Показатель степенного закона: чем больше, тем сильнее комментарии
+# собираются у немногих популярных новостей.
+POPULARITY_EXPONENT = 1.0
+DAYS = 5 * 365
+# Дата, от которой отсчитываются даты новостей, если не задана --today:
+# с текущей датой одно и то же зерно давало бы разные данные.
+TODAY = date(2025, 1, 1)
+
+
+def sentence(generator, low, high):
+    words = generator.choices(WORDS, k=generator.randint(low, high))
+    return ' '.join(words).capitalize() + '.'
+
+
+def batches(objects, size):
+    objects = iter(objects)
+    while batch := list(itertools.islice(objects, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт пользователей, новости и комментарии для нагрузочного '
+        'тестирования.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--news', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=1_000_000)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Одинаковое зерно даёт одинаковые данные.',
+        )
+        parser.add_argument(
+            '--today', type=date.fromisoformat, default=TODAY,
+            help='Дата самой свежей новости в формате ГГГГ-ММ-ДД.',
+        )
+
+    def handle(self, *args, **options):
+        self.generator = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.prefix = f'load-{options["seed"]}'
+        self.today = options['today']
+        user_ids = self.create_users(options['users'])
+        news = self.create_news(options['news'])
+        self.create_comments(options['comments'], news, user_ids)
+        bump_content_version()
+
+    def report(self, name, count, started):
+        seconds = time.perf_counter() - started
+        self.stdout.write(
+            f'{name}: {count} за {seconds:.1f} с '
+            f'({count / seconds if seconds else 0:.0f} строк/с)'
+        )
+
+    def insert(self, model, objects, saved=None):
+        """
+        bulk_create пачками, каждая пачка — отдельная транзакция.
+
+        Созданные объекты не копятся: что из них нужно дальше,
+        забирает saved(batch) в той же транзакции, что и вставка.
+        """
+        for batch in batches(objects, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+                if saved is not None:
+                    saved(batch)
+
+    def create_users(self, count):
+        started = time.perf_counter()
+        User = get_user_model()
+        password = make_password(None)
+        user_ids = []
+        self.insert(User, (
+            User(username=f'{self.prefix}-user-{index}', password=password)
+            for index in range(count)
+        ), lambda batch: user_ids.extend(user.pk for user in batch))
+        self.report('Пользователи', count, started)
+        return user_ids
+
+    def create_news(self, count):
+        """Новости за DAYS дней до --today. Возвращает пары (pk, date)."""
+        started = time.perf_counter()
+        news = []
+        self.insert(News, (
+            News(
+                title=sentence(self.generator, 2, 5)[:50],
+                text=' '.join(
+                    sentence(self.generator, 5, 15)
+                    for _ in range(self.generator.randint(3, 15))
+                ),
+                date=self.today - timedelta(
+                    days=self.generator.randrange(DAYS)
+                ),
+            )
+            for _ in range(count)
+        ), lambda batch: news.extend((item.pk, item.date) for item in batch))
+        self.report('Новости', count, started)
+        return news
+
+    def create_comments(self, count, news, user_ids):
+        """
+        Комментарии по степенному закону популярности новостей.
+
+        Большинство новостей получает несколько комментариев,
+        а немногие популярные — тысячи. Новость выбирается для
+        каждого комментария по ходу вставки.
+        """
+        if not news or not user_ids:
+            return
+        started = time.perf_counter()
+        now = datetime.combine(
+            self.today + timedelta(days=1), datetime.min.time(), timezone.utc
+        )
+        popular = self.generator.sample(news, len(news))
+        weights = list(itertools.accumulate(
+            rank ** -POPULARITY_EXPONENT for rank in range(1, len(news) + 1)
+        ))
+
+        def comments():
+            for _ in range(count):
+                [(news_id, news_date)] = self.generator.choices(
+                    popular, cum_weights=weights
+                )
+                created = min(now, datetime.combine(
+                    news_date, datetime.min.time(), timezone.utc
+                ) + timedelta(seconds=self.generator.randrange(7 * 86400)))
+                yield Comment(
+                    news_id=news_id,
+                    author_id=self.generator.choice(user_ids),
+                    text=sentence(self.generator, 3, 30),
+                    modified=created,
+                )
+
+        def set_created(batch):
+            """
+            Время создания из modified.
+
+            При вставке created заполняет auto_now_add. Пачка вставлена
+            в своей транзакции, поэтому её id идут подряд.
+            """
+            Comment.objects.filter(
+                pk__range=(batch[0].pk, batch[-1].pk)
+            ).update(created=F('modified'))
+
+        self.insert(Comment, comments(), set_created)
+        # bulk_create не отправляет сигналы, которые ведут счётчики.
+        for batch in batches((pk for pk, _ in news), self.batch_size):
+            with transaction.atomic():
+                News.objects.filter(pk__in=batch).recount_comments()
+        self.report('Комментарии', count, started)
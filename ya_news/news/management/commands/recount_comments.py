@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news.models import News
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённые счётчики комментариев новостей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько новостей пересчитывать в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        last_id = 0
+        updated = 0
+        while True:
+            ids = list(
+                News.objects.filter(pk__gt=last_id).order_by('pk')
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            with transaction.atomic():
+                updated += News.objects.filter(pk__in=ids).recount_comments()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано новостей: {updated}.')
+        )
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-18 04:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['-date', '-id'], name='news_date_id_idx'),
+        ),
+    ]
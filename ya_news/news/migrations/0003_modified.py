@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-18 04:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_news_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='modified',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='modified',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Изменено'),
+        ),
+    ]
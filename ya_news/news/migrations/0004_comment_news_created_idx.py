@@ -0,0 +1,25 @@
+# Generated by Django 5.1.1 on 2026-10-18 04:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_modified'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='news',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='news.news'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['news', 'created'], name='comment_news_created_idx'),
+        ),
+    ]
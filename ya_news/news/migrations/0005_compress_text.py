@@ -0,0 +1,59 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:28
+
+import news.fields
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+def convert_texts(compress):
+    """
+    Сжимает или распаковывает тексты новостей пачками по BATCH_SIZE.
+
+    Строки читаются курсором по id, в память попадает одна пачка,
+    а переписываются только изменившиеся значения.
+    """
+    def run(apps, schema_editor):
+        News = apps.get_model('news', 'News')
+        field = News._meta.get_field('text')
+        connection = schema_editor.connection
+        table = connection.ops.quote_name(News._meta.db_table)
+        last_id = 0
+        with connection.cursor() as cursor:
+            while True:
+                cursor.execute(
+                    f'SELECT id, text FROM {table} WHERE id > %s '
+                    f'ORDER BY id LIMIT %s',
+                    (last_id, BATCH_SIZE),
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                updates = []
+                for pk, stored in rows:
+                    text = news.fields.decompress(stored)
+                    value = field.get_prep_value(text) if compress else text
+                    if value != stored:
+                        updates.append((value, pk))
+                if updates:
+                    cursor.executemany(
+                        f'UPDATE {table} SET text = %s WHERE id = %s', updates
+                    )
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_comment_news_created_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='news',
+            name='text',
+            field=news.fields.CompressedTextField(compress_above=1024),
+        ),
+        migrations.RunPython(convert_texts(True), convert_texts(False)),
+    ]
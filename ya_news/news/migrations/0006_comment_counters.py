@@ -0,0 +1,54 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:34
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def count_comments(apps, schema_editor):
+    """Заполняет счётчики пачками новостей по id."""
+    News = apps.get_model('news', 'News')
+    Comment = apps.get_model('news', 'Comment')
+    comments = Comment.objects.filter(news=OuterRef('pk')).order_by()
+    last_id = 0
+    while True:
+        ids = list(
+            News.objects.filter(pk__gt=last_id).order_by('pk')
+            .values_list('pk', flat=True)[:BATCH_SIZE]
+        )
+        if not ids:
+            break
+        last_id = ids[-1]
+        News.objects.filter(pk__in=ids).update(
+            comment_count=Coalesce(Subquery(
+                comments.values('news').annotate(
+                    count=Count('pk')
+                ).values('count')
+            ), 0),
+            last_comment_at=Subquery(
+                comments.order_by('-created').values('created')[:1]
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_compress_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Комментариев'),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='last_comment_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Последний комментарий'),
+        ),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
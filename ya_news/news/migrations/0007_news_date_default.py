@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:10
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_comment_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='news',
+            name='date',
+            field=models.DateField(default=datetime.datetime.today),
+        ),
+    ]
@@ -2,15 +2,80 @@ from datetime import datetime
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
+from .fields import CompressedTextField
 
-class News(models.Model):
+
+class ModifiedMixin(models.Model):
+    """
+    Время последнего изменения объекта.
+
+    Вместо auto_now задаём значение по умолчанию: оно нужно загрузке
+    фикстур, которая сохраняет объекты в обход save().
+    """
+    modified = models.DateTimeField(
+        'Изменено', default=timezone.now, editable=False
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.modified = timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'modified'}
+        super().save(*args, **kwargs)
+
+
+class NewsQuerySet(models.QuerySet):
+
+    def recount_comments(self):
+        """
+        Пересчитывает сохранённые счётчики комментариев новостей.
+
+        Оба значения вычисляются коррелированными подзапросами по индексу
+        (news, created) одним UPDATE.
+        """
+        comments = Comment.objects.filter(news=OuterRef('pk')).order_by()
+        return self.update(
+            comment_count=Coalesce(Subquery(
+                comments.values('news').annotate(
+                    count=Count('pk')
+                ).values('count')
+            ), 0),
+            last_comment_at=Subquery(
+                comments.order_by('-created').values('created')[:1]
+            ),
+        )
+
+
+class News(ModifiedMixin):
     title = models.CharField(max_length=50)
-    text = models.TextField()
+    # Длинный текст хранится сжатым: text__icontains и другие
+    # условия по шаблону такие новости не находят.
+    text = CompressedTextField()
     date = models.DateField(default=datetime.today)
+    # Счётчики комментариев хранятся в новости, чтобы страницы
+    # не считали таблицу комментариев. Их обновляют сигналы
+    # комментариев, а команда recount_comments пересчитывает заново.
+    comment_count = models.PositiveIntegerField(
+        'Комментариев', default=0, editable=False
+    )
+    last_comment_at = models.DateTimeField(
+        'Последний комментарий', null=True, blank=True, editable=False
+    )
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date', '-id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
@@ -18,10 +83,12 @@ class News(models.Model):
         return self.title
 
 
-class Comment(models.Model):
+class Comment(ModifiedMixin):
     news = models.ForeignKey(
         News,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        # Поиск по новости обслуживает составной индекс ниже.
+        db_index=False,
     )
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -32,6 +99,11 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created'), name='comment_news_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
@@ -0,0 +1,94 @@
+import os
+import re
+import threading
+
+NEVER_MATCHES = re.compile(r'(?!)')
+
+
+def compile_words(words):
+    """
+    Одно регулярное выражение для поиска любого слова из списка.
+
+    Слова складываются в префиксное дерево, и выражение повторяет его
+    структуру: на каждом символе текста движок проверяет только
+    продолжения общего префикса, а не все слова подряд. Поэтому текст
+    просматривается за один проход почти независимо от размера словаря.
+    """
+    trie = {}
+    for word in words:
+        if not word:
+            continue
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    if not trie:
+        return NEVER_MATCHES
+    return re.compile(_trie_to_pattern(trie))
+
+
+def _trie_to_pattern(node):
+    branches = [
+        re.escape(char) + _trie_to_pattern(child)
+        for char, child in sorted(node.items())
+        if char
+    ]
+    if not branches:
+        return ''
+    ends_here = '' in node
+    if len(branches) == 1 and not ends_here:
+        return branches[0]
+    group = f'(?:{"|".join(branches)})'
+    # Слово может закончиться в этом узле, а может продолжиться.
+    return f'{group}?' if ends_here else group
+
+
+class ProfanityMatcher:
+    """
+    Проверка текста по словарю запрещённых слов.
+
+    Словарь складывается из встроенных слов и файла, по слову на строку.
+    Выражение собирается один раз и пересобирается, только когда файл
+    изменился: изменения словаря подхватываются без перезапуска.
+    """
+
+    def __init__(self, words=(), path=None):
+        self.words = tuple(word.lower() for word in words)
+        self.path = path
+        self._mtime = None
+        self._pattern = None
+        self._lock = threading.Lock()
+
+    def _file_mtime(self):
+        if self.path is None:
+            return None
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load_file(self):
+        if self.path is None:
+            return ()
+        try:
+            with open(self.path, encoding='utf-8') as lexicon:
+                return tuple(
+                    line.strip().lower() for line in lexicon if line.strip()
+                )
+        except FileNotFoundError:
+            return ()
+
+    def get_pattern(self):
+        mtime = self._file_mtime()
+        if self._pattern is None or mtime != self._mtime:
+            with self._lock:
+                if self._pattern is None or mtime != self._mtime:
+                    self._pattern = compile_words(
+                        self.words + self._load_file()
+                    )
+                    self._mtime = mtime
+        return self._pattern
+
+    def search(self, text):
+        """Есть ли в тексте хотя бы одно слово из словаря."""
+        return self.get_pattern().search(text.lower()) is not None
@@ -0,0 +1,139 @@
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+
+class KeysetPaginator:
+    """
+    Постраничный вывод по ключу сортировки вместо OFFSET.
+
+    Курсор хранит значения полей последнего объекта страницы, поэтому
+    следующая страница начинается с поиска по индексу, а не с пропуска
+    всех предыдущих строк. Последнее поле сортировки должно быть
+    уникальным, например ``id``.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset.order_by(*ordering)
+        self.ordering = [
+            (name.lstrip('-'), name.startswith('-')) for name in ordering
+        ]
+        self.per_page = per_page
+
+    def get_page(self, cursor=None):
+        """
+        Возвращает страницу после курсора.
+
+        Неправильный курсор приводит к 404, как и несуществующий номер
+        страницы у стандартного пагинатора.
+        """
+        queryset = self.queryset
+        if cursor:
+            queryset = queryset.filter(
+                self._after(self.decode_cursor(cursor))
+            )
+        return KeysetPage(self, queryset[:self.per_page])
+
+    def _after(self, values):
+        """
+        Условие «строго после курсора» для составного ключа.
+
+        Первое поле ограничено ещё и нестрогим неравенством: так база
+        данных начинает чтение индекса сразу с нужного места.
+        """
+        first_name, first_descending = self.ordering[0]
+        lookup = 'lte' if first_descending else 'gte'
+        alternatives = []
+        for index, (name, descending) in enumerate(self.ordering):
+            equal = {
+                previous: values[position]
+                for position, (previous, _) in enumerate(
+                    self.ordering[:index]
+                )
+            }
+            lookup_after = 'lt' if descending else 'gt'
+            alternatives.append(
+                Q(**equal, **{f'{name}__{lookup_after}': values[index]})
+            )
+        return (
+            Q(**{f'{first_name}__{lookup}': values[0]})
+            & reduce(or_, alternatives)
+        )
+
+    def encode_cursor(self, obj):
+        fields = [
+            obj._meta.get_field(name) for name, _ in self.ordering
+        ]
+        values = [field.value_to_string(obj) for field in fields]
+        return base64.urlsafe_b64encode(
+            json.dumps(values).encode()
+        ).decode()
+
+    def decode_cursor(self, cursor):
+        model = self.queryset.model
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.ordering, values)
+            ]
+        except (
+            ValueError, TypeError, binascii.Error, ValidationError
+        ):
+            raise Http404('Неправильный курсор страницы.')
+
+
+class KeysetPage:
+    """
+    Страница keyset-пагинатора.
+
+    Ссылка на следующую страницу показывается, если текущая заполнена
+    целиком: так на страницу уходит ровно один запрос.
+    """
+
+    def __init__(self, paginator, object_list):
+        self.paginator = paginator
+        self.object_list = object_list
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return len(self.object_list) == self.paginator.per_page
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        last = self.object_list[len(self.object_list) - 1]
+        return self.paginator.encode_cursor(last)
+
+
+class CappedCountPaginator(Paginator):
+    """
+    Пагинатор, который не считает строки дальше max_count.
+
+    Точный COUNT(*) по большой таблице читает её целиком. Здесь база
+    останавливается на max_count + 1 строке, а страниц показывается
+    столько, сколько помещается в max_count.
+    """
+    max_count = 10_000
+
+    @cached_property
+    def count(self):
+        """Сортировка и аннотации для подсчёта строк не нужны."""
+        rows = self.object_list.order_by().values('pk')
+        return min(rows[:self.max_count + 1].count(), self.max_count)
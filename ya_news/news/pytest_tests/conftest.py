@@ -2,15 +2,35 @@ from datetime import timedelta
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test.client import Client
 from django.urls import reverse
 from django.utils import timezone
 
+from news import slow_queries
 from news.models import Comment, News
 
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def detect_n_plus_one(settings):
+    """Запрос N+1 в любом представлении роняет тест."""
+    settings.NEWS_NPLUSONE_MAX_REPEATS = 3
+    settings.NEWS_NPLUSONE_RAISE = True
+
+
+@pytest.fixture(autouse=True)
+def disable_slow_query_log(settings):
+    """Журнал медленных запросов включает только фикстура slow_query_log."""
+    settings.NEWS_SLOW_QUERY_MS = None
+
+
 @pytest.fixture
 def author(django_user_model):
     return django_user_model.objects.create(username='Автор комментария')
@@ -116,3 +136,23 @@ def logout_url():
 @pytest.fixture
 def signup_url():
     return reverse('users:signup')
+
+
+@pytest.fixture
+def server_timing(settings):
+    """Замеры времени для каждого запроса."""
+    middleware = 'news.timing.ServerTimingMiddleware'
+    if middleware not in settings.MIDDLEWARE:
+        settings.MIDDLEWARE = [middleware, *settings.MIDDLEWARE]
+    settings.NEWS_TIMING_SAMPLE_RATE = 1.0
+
+
+@pytest.fixture
+def slow_query_log(settings, monkeypatch):
+    """Каждый запрос к базе считается медленным, журнал — в caplog."""
+    settings.NEWS_SLOW_QUERY_MS = 0
+    monkeypatch.setattr(slow_queries.logger, 'handlers', [])
+    monkeypatch.setattr(slow_queries.logger, 'propagate', True)
+    slow_queries.reset_slow_queries()
+    yield
+    slow_queries.reset_slow_queries()
@@ -0,0 +1,136 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import include, path, reverse
+from pytest_django.asserts import assertRedirects
+
+from news import async_views
+from news import urls as news_urls
+from news.models import Comment
+from news.slow_queries import get_slow_queries
+from yanews.urls import auth_urls
+
+pytestmark = [pytest.mark.django_db, pytest.mark.urls(__name__)]
+
+# Те же маршруты, что включает NEWS_ASYNC_VIEWS под ASGI.
+urlpatterns = [
+    path('', include(([
+        path('', async_views.AsyncNewsList.as_view(), name='home'),
+        path(
+            'news/<int:pk>/',
+            async_views.AsyncNewsDetailView.as_view(),
+            name='detail',
+        ),
+        *news_urls.urlpatterns,
+    ], 'news'))),
+    path('auth/', include(auth_urls)),
+]
+
+
+def test_home_page(many_news, client, django_assert_num_queries):
+    # Arrange
+    url = reverse('news:home')
+    client.get(url)
+
+    # Act
+    with django_assert_num_queries(0):
+        response = client.get(url)
+
+    # Assert
+    assert response.status_code == HTTPStatus.OK
+    assert many_news[0].title in response.content.decode()
+
+
+def test_detail_page(comment, author_client, detail_url):
+    # Arrange
+    # (данные подготовлены фикстурами)
+
+    # Act
+    response = author_client.get(detail_url)
+
+    # Assert
+    assert response.context['comments'] == [comment]
+    assert 'form' in response.context
+    assert reverse('news:edit', args=(comment.pk,)) in (
+        response.content.decode()
+    )
+
+
+def test_detail_page_server_timing(
+    server_timing, comment, async_client, detail_url
+):
+    # Arrange
+    # (данные подготовлены фикстурами)
+
+    # Act
+    response = async_to_sync(async_client.get)(detail_url)
+
+    # Assert
+    header = response['Server-Timing']
+    assert re.search(r'db;dur=[\d.]+;desc="[1-9]\d* SQL"', header)
+    assert re.search(r'tpl;dur=[\d.]*[1-9]', header)
+
+
+def test_detail_page_slow_queries(
+    slow_query_log, comment, async_client, detail_url
+):
+    # Arrange
+    # (данные подготовлены фикстурами)
+
+    # Act
+    async_to_sync(async_client.get)(detail_url)
+
+    # Assert
+    queries = get_slow_queries()['news:detail']
+    assert any('FROM "news_comment"' in query['sql'] for query in queries)
+    assert all(query['view'] == 'news:detail' for query in queries)
+
+
+def test_detail_not_modified(news, client, detail_url):
+    # Arrange
+    etag = client.get(detail_url)['ETag']
+
+    # Act
+    response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+
+    # Assert
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_home_not_modified_under_asgi(news, async_client):
+    # Arrange
+    url = reverse('news:home')
+    etag = async_to_sync(async_client.get)(url)['ETag']
+
+    # Act
+    response = async_to_sync(async_client.get)(
+        url, headers={'If-None-Match': etag}
+    )
+
+    # Assert
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_missing_news(client):
+    # Arrange
+    url = reverse('news:detail', args=(0,))
+
+    # Act
+    response = client.get(url)
+
+    # Assert
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_comment_is_saved_by_sync_view(author_client, news, detail_url):
+    # Arrange
+    data = {'text': 'Комментарий'}
+
+    # Act
+    response = author_client.post(detail_url, data=data)
+
+    # Assert
+    assertRedirects(response, f'{detail_url}#comments')
+    assert Comment.objects.get().text == data['text']
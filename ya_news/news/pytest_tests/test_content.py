@@ -1,7 +1,18 @@
+import logging
+import re
+from datetime import timedelta
+
 import pytest
 from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
 
+from news.admin import LatestCommentsFormSet
+from news.cache import fragment_stats, get_fragment_stats
 from news.forms import CommentForm
+from news.models import Comment, News
+from news.pagination import CappedCountPaginator
+from news.slow_queries import get_slow_queries
 
 pytestmark = pytest.mark.django_db
 
@@ -70,3 +81,245 @@ def test_authorized_client_has_form(author_client, detail_url):
     # Assert
     assert 'form' in response.context
     assert isinstance(response.context['form'], CommentForm)
+
+
+def test_comment_count_on_home_page(
+    many_comments, client, home_url, django_assert_num_queries
+):
+    # Arrange
+    # (данные подготовлены фикстурами)
+
+    # Act
+    with django_assert_num_queries(1):
+        response = client.get(home_url)
+
+    # Assert
+    news = response.context['object_list'][0]
+    assert news.comment_count == len(many_comments)
+    assert f'Комментариев: {len(many_comments)}' in response.content.decode()
+
+
+def test_archive_pages_through_all_news(many_news, client, settings):
+    # Arrange
+    settings.NEWS_COUNT_ON_ARCHIVE_PAGE = 4
+    News.objects.bulk_create(
+        News(title=f'Новость дня {index}', text='Текст')
+        for index in range(5)
+    )
+    url = reverse('news:archive')
+    seen = []
+    params = {}
+
+    # Act
+    while params is not None:
+        response = client.get(url, params)
+        page = response.context['page_obj']
+        seen.extend(response.context['object_list'])
+        params = {'after': page.next_cursor} if page.has_next() else None
+
+    # Assert
+    expected = News.objects.order_by('-date', '-id')
+    assert [news.pk for news in seen] == [news.pk for news in expected]
+
+
+def test_home_page_is_cached_for_anonymous_user(
+    news, client, home_url, django_assert_num_queries
+):
+    # Arrange
+    client.get(home_url)
+
+    # Act
+    with django_assert_num_queries(0):
+        response = client.get(home_url)
+
+    # Assert
+    assert news.title in response.content.decode()
+
+
+def test_cached_home_page_shows_new_comment(
+    news, author, client, home_url, django_capture_on_commit_callbacks
+):
+    # Arrange
+    client.get(home_url)
+
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.create(news=news, author=author, text='Текст')
+    response = client.get(home_url)
+
+    # Assert
+    assert 'Комментариев: 1' in response.content.decode()
+
+
+def test_comment_fragments_come_from_cache(
+    many_comments, comment, reader_client, detail_url
+):
+    # Arrange
+    fragment_stats.clear()
+    reader_client.get(detail_url)
+    comment.text = 'Исправленный комментарий'
+    comment.save()
+
+    # Act
+    response = reader_client.get(detail_url)
+
+    # Assert
+    stats = get_fragment_stats()['comment']
+    assert stats['hits'] == len(many_comments)
+    assert stats['misses'] == len(many_comments) + 2
+    assert comment.text in response.content.decode()
+
+
+def test_cached_comment_shows_renamed_author(
+    comment, author, reader_client, detail_url
+):
+    # Arrange
+    reader_client.get(detail_url)
+    author.username = 'Новое имя'
+    author.save()
+
+    # Act
+    response = reader_client.get(detail_url)
+
+    # Assert
+    assert author.username in response.content.decode()
+
+
+def test_comments_are_paginated(
+    many_comments, client, detail_url, settings, django_assert_num_queries
+):
+    # Arrange
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 4
+    news = many_comments[0].news
+    comments_url = reverse('news:comments', args=(news.pk,))
+    seen = []
+
+    # Act
+    with django_assert_num_queries(3):
+        response = client.get(detail_url)
+    while True:
+        page = response.context['comments_page']
+        seen.extend(response.context['comments'])
+        if not page.has_next():
+            break
+        response = client.get(comments_url, {'after': page.next_cursor})
+
+    # Assert
+    assert [comment.pk for comment in seen] == [
+        comment.pk for comment in many_comments
+    ]
+    assert seen[0].author_username == many_comments[0].author.username
+
+
+def test_admin_inline_shows_latest_comments(
+    news, author, admin_client, monkeypatch
+):
+    # Arrange
+    monkeypatch.setattr(LatestCommentsFormSet, 'max_comments', 3)
+    now = timezone.now()
+    comments = Comment.objects.bulk_create(
+        Comment(
+            news=news, author=author, text=f'Комментарий {index}',
+            created=now + timedelta(minutes=index),
+        )
+        for index in range(10)
+    )
+    url = reverse('admin:news_news_change', args=(news.pk,))
+
+    # Act
+    response = admin_client.get(url)
+
+    # Assert
+    formset = response.context['inline_admin_formsets'][0].formset
+    assert [form.instance.pk for form in formset.forms] == [
+        comment.pk for comment in comments[-3:]
+    ]
+
+
+def test_admin_changelist_shows_comment_count(
+    news, comment, admin_client, monkeypatch
+):
+    # Arrange
+    monkeypatch.setattr(CappedCountPaginator, 'max_count', 2)
+    News.objects.bulk_create(
+        News(title='Старая новость', text='Текст',
+             date=news.date - timedelta(days=1))
+        for _ in range(3)
+    )
+    url = reverse('admin:news_news_changelist')
+
+    # Act
+    response = admin_client.get(url)
+
+    # Assert
+    changelist = response.context['cl']
+    counts = {item.pk: item.comment_count for item in changelist.result_list}
+    assert counts[news.pk] == 1
+    assert changelist.result_count == 2
+
+
+def test_server_timing_header(
+    server_timing, comment, client, detail_url, caplog
+):
+    # Arrange
+    client.get(detail_url)
+
+    # Act
+    with caplog.at_level(logging.INFO, logger='news.timing'):
+        response = client.get(detail_url)
+
+    # Assert
+    header = response['Server-Timing']
+    assert re.search(r'db;dur=[\d.]+;desc="[1-9]\d* SQL"', header)
+    assert re.search(r'tpl;dur=[\d.]*[1-9]', header)
+    assert 'cache;desc="hit=1 miss=0"' in header
+    record = caplog.records[-1]
+    assert record.route == 'news:detail'
+    assert record.cache_hits == 1
+
+
+def test_server_timing_skips_unsampled_requests(
+    server_timing, settings, news, client, detail_url
+):
+    # Arrange
+    settings.NEWS_TIMING_SAMPLE_RATE = 0.0
+
+    # Act
+    response = client.get(detail_url)
+
+    # Assert
+    assert 'Server-Timing' not in response
+
+
+def test_slow_query_points_to_template_line(
+    slow_query_log, comment, client, detail_url, caplog
+):
+    # Act
+    with caplog.at_level(logging.WARNING, logger='news.slow_queries'):
+        client.get(detail_url)
+
+    # Assert
+    [comments_query] = [
+        query for query in get_slow_queries()['news:detail']
+        if 'FROM "news_comment"' in query['sql']
+    ]
+    assert comments_query['template'] == 'news/includes/comments.html:2'
+    assert comments_query['params'] == repr((comment.news_id,))
+    assert {record.view for record in caplog.records} == {'news:detail'}
+
+
+def test_slow_queries_keep_top_per_view(
+    slow_query_log, settings, news, client, detail_url
+):
+    # Arrange
+    settings.NEWS_SLOW_QUERY_TOP = 2
+
+    # Act
+    for _ in range(3):
+        client.get(detail_url)
+
+    # Assert
+    queries = get_slow_queries()['news:detail']
+    assert len(queries) == 2
+    assert queries[0]['ms'] >= queries[1]['ms']
+    assert all(query['code'] for query in queries if not query['template'])
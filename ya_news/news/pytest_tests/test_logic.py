@@ -1,10 +1,19 @@
+import os
+import threading
 from http import HTTPStatus
+from io import StringIO
 
 import pytest
+from django.core import serializers
+from django.core.management import call_command
+from django.db import OperationalError, connection, transaction
+from django.urls import reverse
+from django.utils import timezone
 from pytest_django.asserts import assertFormError, assertRedirects
 
 from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.models import Comment, News
+from news.moderation import ProfanityMatcher
 
 pytestmark = pytest.mark.django_db
 
@@ -119,3 +128,251 @@ def test_user_cant_edit_comment_of_another_user(
     # Assert
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert comment.text != FORM_DATA['text']
+
+
+def test_bad_words_from_lexicon_file(tmp_path):
+    # Arrange
+    lexicon = tmp_path / 'bad_words.txt'
+    lexicon.write_text('Мерзавец\n', encoding='utf-8')
+    matcher = ProfanityMatcher(BAD_WORDS, lexicon)
+
+    # Act
+    found = matcher.search('Какой-то мерзавец написал')
+
+    # Assert
+    assert found
+    assert matcher.search(f'Ещё и {BAD_WORDS[1]}')
+    assert not matcher.search('Вежливый комментарий')
+
+
+def test_lexicon_file_is_reloaded_after_change(tmp_path):
+    # Arrange
+    lexicon = tmp_path / 'bad_words.txt'
+    lexicon.write_text('мерзавец\n', encoding='utf-8')
+    matcher = ProfanityMatcher(path=lexicon)
+    matcher.search('Текст')
+    lexicon.write_text('мерзавец\nзлодей\n', encoding='utf-8')
+    stat = lexicon.stat()
+    os.utime(lexicon, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    # Act
+    found = matcher.search('Злодей!')
+
+    # Assert
+    assert found
+
+
+def test_long_news_text_is_stored_compressed():
+    # Arrange
+    text = 'Длинный текст новости. ' * 200
+
+    # Act
+    news = News.objects.create(title='Заголовок', text=text)
+
+    # Assert
+    stored = News.objects.filter(pk=news.pk).values_list('text', flat=True)
+    assert isinstance(stored[0], bytes)
+    assert len(stored[0]) < len(text.encode())
+    assert News.objects.get(pk=news.pk).text == text
+
+
+def test_short_news_text_is_stored_as_is(news):
+    # Act
+    stored = News.objects.filter(pk=news.pk).values_list('text', flat=True)
+
+    # Assert
+    assert stored[0] == news.text
+
+
+def test_compressed_text_is_unpacked_on_access():
+    # Arrange
+    text = 'Длинный текст новости. ' * 200
+    news = News.objects.create(title='Заголовок', text=text)
+
+    # Act
+    loaded = News.objects.get(pk=news.pk)
+    loaded.title = 'Новый заголовок'
+    loaded.save()
+
+    # Assert
+    assert isinstance(loaded.__dict__['text'], bytes)
+    assert News.objects.get(pk=news.pk).text == text
+
+
+def test_comment_counters_follow_writes(author_client, news, detail_url):
+    # Act
+    for _ in range(2):
+        author_client.post(detail_url, data=FORM_DATA)
+    created = News.objects.get(pk=news.pk)
+    first = Comment.objects.earliest('created')
+    author_client.post(reverse('news:delete', args=(first.pk,)))
+    deleted = News.objects.get(pk=news.pk)
+
+    # Assert
+    latest = Comment.objects.get()
+    assert created.comment_count == 2
+    assert created.last_comment_at == latest.created
+    assert deleted.comment_count == 1
+    assert deleted.last_comment_at == latest.created
+
+
+def test_deleting_last_comment_clears_last_comment_at(
+    author_client, news, delete_url
+):
+    # Act
+    author_client.post(delete_url)
+
+    # Assert
+    news.refresh_from_db()
+    assert news.comment_count == 0
+    assert news.last_comment_at is None
+
+
+def test_loaddata_keeps_fixture_counters(author, news, tmp_path):
+    # Arrange
+    fixture = tmp_path / 'comments.json'
+    fixture.write_text(serializers.serialize('json', [
+        Comment(
+            news=news, author=author, text='Комментарий из фикстуры',
+            created=timezone.now(),
+        )
+    ]))
+
+    # Act
+    call_command('loaddata', fixture, stdout=StringIO())
+
+    # Assert
+    news.refresh_from_db()
+    assert Comment.objects.count() == 1
+    assert news.comment_count == 0
+
+
+def test_recount_comments_repairs_counters(news, comment, many_news):
+    # Arrange
+    News.objects.update(comment_count=100, last_comment_at=timezone.now())
+
+    # Act
+    call_command('recount_comments', batch_size=4)
+
+    # Assert
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    assert news.last_comment_at == comment.created
+    assert not News.objects.exclude(pk=news.pk).exclude(
+        comment_count=0, last_comment_at=None
+    ).exists()
+
+
+def test_generate_data_is_deterministic(django_user_model):
+    # Arrange
+    options = {
+        'users': 5, 'news': 20, 'comments': 200, 'batch_size': 30,
+        'seed': 1, 'stdout': StringIO(),
+    }
+    call_command('generate_data', **options)
+    first = list(News.objects.values_list('title', 'comment_count'))
+    django_user_model.objects.all().delete()
+    News.objects.all().delete()
+
+    # Act
+    call_command('generate_data', **options)
+
+    # Assert
+    second = list(News.objects.values_list('title', 'comment_count'))
+    assert second == first
+    assert sum(count for _, count in second) == 200
+    assert max(count for _, count in second) > 200 / 20
+    assert not Comment.objects.filter(created__gt=timezone.now()).exists()
+
+
+def create_comment_until_unlocked(news, author, text):
+    """
+    Общий кеш SQLite в памяти не ждёт блокировку, а сразу сообщает
+    о ней, поэтому транзакция повторяется, как повторил бы клиент.
+    """
+    while True:
+        try:
+            with transaction.atomic():
+                return Comment.objects.create(
+                    news=news, author=author, text=text
+                )
+        except OperationalError as error:
+            if 'locked' not in str(error):
+                raise
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_comments_keep_counters_consistent(news, author):
+    # Arrange
+    writers = 8
+    comments_per_writer = 10
+    barrier = threading.Barrier(writers)
+    errors = []
+
+    def write():
+        barrier.wait()
+        try:
+            for index in range(comments_per_writer):
+                create_comment_until_unlocked(news, author, f'Текст {index}')
+        except Exception as error:
+            errors.append(error)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=write) for _ in range(writers)]
+
+    # Act
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert
+    assert errors == []
+    news.refresh_from_db()
+    assert news.comment_count == writers * comments_per_writer
+    assert news.comment_count == Comment.objects.filter(news=news).count()
+    assert news.last_comment_at == Comment.objects.latest('created').created
+
+
+def test_comment_burst_is_throttled(
+    author_client, detail_url, settings, monkeypatch
+):
+    # Arrange
+    settings.NEWS_THROTTLE_RATES = {'comment': {'user': '3/min'}}
+    now = 1_000_000.0
+    monkeypatch.setattr('news.throttling.time.time', lambda: now)
+
+    # Act
+    burst = [
+        author_client.post(detail_url, data=FORM_DATA) for _ in range(5)
+    ]
+    now += 20
+    after_wait = author_client.post(detail_url, data=FORM_DATA)
+
+    # Assert
+    assert [response.status_code for response in burst] == [
+        HTTPStatus.FOUND, HTTPStatus.FOUND, HTTPStatus.FOUND,
+        HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.TOO_MANY_REQUESTS,
+    ]
+    assert burst[-1]['Retry-After'] == '20'
+    assert after_wait.status_code == HTTPStatus.FOUND
+    assert Comment.objects.count() == 4
+
+
+def test_comment_throttle_is_shared_by_address(
+    author_client, reader_client, detail_url, settings
+):
+    # Arrange
+    settings.NEWS_THROTTLE_RATES = {
+        'comment': {'user': '10/min', 'ip': '2/min'}
+    }
+
+    # Act
+    for _ in range(2):
+        author_client.post(detail_url, data=FORM_DATA)
+    response = reader_client.post(detail_url, data=FORM_DATA)
+
+    # Assert
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert Comment.objects.count() == 2
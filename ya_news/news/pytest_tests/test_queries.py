@@ -0,0 +1,237 @@
+import logging
+
+import pytest
+import pytest_lazyfixture
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.http import HttpResponse
+from django.template import engines
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse
+
+from news.models import Comment, News
+from news.nplusone import NPlusOneError
+
+pytestmark = pytest.mark.django_db
+
+ANONYMOUS = pytest_lazyfixture.lazy_fixture('client')
+AUTHOR = pytest_lazyfixture.lazy_fixture('author_client')
+FORM_DATA = {'text': 'Новый текст комментария'}
+
+
+def comment_authors(request):
+    """Автор каждого комментария — отдельным запросом."""
+    return HttpResponse(', '.join(
+        comment.author.username for comment in Comment.objects.all()
+    ))
+
+
+def comment_counts(request):
+    """Число комментариев каждой новости — отдельным запросом."""
+    template = engines['django'].from_string(
+        '{% for news in object_list %}{{ news.comment_set.count }}{% endfor %}'
+    )
+    return HttpResponse(template.render({'object_list': News.objects.all()}))
+
+
+def group_counts(request):
+    """Число групп каждого пользователя — отдельным запросом."""
+    return HttpResponse(', '.join(
+        str(user.groups.count()) for user in get_user_model().objects.all()
+    ))
+
+
+def group_sizes(request):
+    """Число пользователей каждой группы — отдельным запросом."""
+    return HttpResponse(', '.join(
+        str(group.user_set.count()) for group in Group.objects.all()
+    ))
+
+
+# Представления с запросами N+1 для проверки детектора.
+async def async_comment_authors(request):
+    """То же из асинхронного представления: запросы идут в другом потоке."""
+    return await sync_to_async(comment_authors)(request)
+
+
+urlpatterns = [
+    path('authors/', comment_authors),
+    path('counts/', comment_counts),
+    path('async/authors/', async_comment_authors),
+    path('groups/', group_counts),
+    path('group-sizes/', group_sizes),
+]
+
+
+@pytest.mark.parametrize(
+    'parametrized_client, method, name, args, data, queries',
+    (
+        # Новости одним запросом, количество комментариев подзапросом.
+        (ANONYMOUS, 'get', 'news:home', None, None, 1),
+        (ANONYMOUS, 'get', 'news:archive', None, None, 1),
+        # Валидаторы ETag, новость и страница комментариев.
+        (ANONYMOUS, 'get', 'news:detail', 'news', None, 3),
+        (ANONYMOUS, 'get', 'news:comments', 'news', None, 2),
+        # Дальше к каждому запросу добавляются сессия и пользователь.
+        (AUTHOR, 'get', 'news:detail', 'news', None, 5),
+        # Новость, вставка комментария и счётчик новости
+        # в транзакции (в тестах это SAVEPOINT и RELEASE).
+        (AUTHOR, 'post', 'news:detail', 'news', FORM_DATA, 7),
+        # Комментарий вместе с новостью.
+        (AUTHOR, 'get', 'news:edit', 'comment', None, 3),
+        # Обновление комментария и отметка об изменении новости.
+        (AUTHOR, 'post', 'news:edit', 'comment', FORM_DATA, 5),
+        (AUTHOR, 'get', 'news:delete', 'comment', None, 3),
+        # Удаление и счётчики новости в транзакции.
+        (AUTHOR, 'post', 'news:delete', 'comment', None, 7),
+    ),
+)
+def test_query_count(
+    request, parametrized_client, method, name, args, data, queries,
+    comment, django_assert_num_queries
+):
+    # Arrange
+    if args is not None:
+        args = (request.getfixturevalue(args).pk,)
+    url = reverse(name, args=args)
+
+    # Act
+    with django_assert_num_queries(queries):
+        response = getattr(parametrized_client, method)(url, data=data)
+
+    # Assert
+    assert response.status_code < 400
+
+
+@pytest.mark.parametrize('comment_count', (1, 100))
+def test_admin_change_page_is_bounded(
+    news, author, admin_client, comment_count, django_assert_max_num_queries
+):
+    # Arrange
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for index in range(comment_count)
+    )
+    url = reverse('admin:news_news_change', args=(news.pk,))
+
+    # Act
+    # Сессия, пользователь, новость, комментарии с авторами
+    # и служебные запросы админки не зависят от числа комментариев.
+    with django_assert_max_num_queries(7):
+        response = admin_client.get(url)
+
+    # Assert
+    assert response.status_code == 200
+
+
+def test_admin_changelist_does_not_count_whole_table(
+    many_news, admin_client
+):
+    # Arrange
+    url = reverse('admin:news_news_changelist')
+
+    # Act
+    with CaptureQueriesContext(connection) as context:
+        admin_client.get(url)
+
+    # Assert
+    counts = [
+        query['sql'] for query in context.captured_queries
+        if 'COUNT(' in query['sql'] and 'news_news' in query['sql']
+        and 'news_comment' not in query['sql']
+    ]
+    assert counts
+    assert all('LIMIT' in sql for sql in counts)
+
+
+@pytest.mark.urls(__name__)
+def test_n_plus_one_points_to_attribute(author, many_comments, client):
+    # Act
+    with pytest.raises(NPlusOneError) as error:
+        client.get('/authors/')
+
+    # Assert
+    message = str(error.value)
+    assert 'Comment.author' in message
+    assert 'test_queries.py' in message
+
+
+@pytest.mark.urls(__name__)
+def test_n_plus_one_in_async_view(author, many_comments, async_client):
+    # Act
+    with pytest.raises(NPlusOneError) as error:
+        async_to_sync(async_client.get)('/async/authors/')
+
+    # Assert
+    assert 'Comment.author' in str(error.value)
+
+
+@pytest.mark.urls(__name__)
+def test_n_plus_one_is_logged_without_raising(
+    settings, many_news, client, caplog
+):
+    # Arrange
+    settings.NEWS_NPLUSONE_RAISE = False
+
+    # Act
+    with caplog.at_level(logging.WARNING, logger='news.nplusone'):
+        response = client.get('/counts/')
+
+    # Assert
+    assert response.status_code == 200
+    [record] = caplog.records
+    assert record.attribute == 'News.comment_set'
+    assert record.template is not None
+
+
+@pytest.mark.urls(__name__)
+@pytest.mark.parametrize(
+    'url, attribute',
+    (('/groups/', 'User.groups'), ('/group-sizes/', 'Group.user_set')),
+)
+def test_n_plus_one_through_many_to_many(
+    url, attribute, settings, django_user_model, client, caplog
+):
+    # Arrange
+    settings.NEWS_NPLUSONE_RAISE = False
+    groups = Group.objects.bulk_create(
+        Group(name=f'Группа {index}') for index in range(5)
+    )
+    for index, group in enumerate(groups):
+        django_user_model.objects.create(
+            username=f'Участник {index}'
+        ).groups.add(group)
+
+    # Act
+    with caplog.at_level(logging.WARNING, logger='news.nplusone'):
+        response = client.get(url)
+
+    # Assert
+    assert response.status_code == 200
+    [record] = caplog.records
+    assert record.attribute == attribute
+
+
+@pytest.mark.urls(__name__)
+def test_n_plus_one_report_failure_keeps_query(
+    settings, many_news, client, caplog, monkeypatch
+):
+    # Arrange
+    settings.NEWS_NPLUSONE_RAISE = False
+
+    def broken_origin():
+        raise RuntimeError
+
+    monkeypatch.setattr('news.nplusone.find_origin', broken_origin)
+
+    # Act
+    with caplog.at_level(logging.WARNING, logger='news.nplusone'):
+        response = client.get('/counts/')
+
+    # Assert
+    assert response.status_code == 200
+    failure, warning = caplog.records
+    assert failure.levelname == 'ERROR'
+    assert warning.attribute is None
@@ -1,10 +1,14 @@
+from datetime import timedelta
 from http import HTTPStatus
 
 import pytest
 import pytest_lazyfixture
 from django.urls import reverse
+from django.utils import timezone
 from pytest_django.asserts import assertRedirects
 
+from news.models import Comment, News
+
 pytestmark = pytest.mark.django_db
 
 
@@ -30,6 +34,28 @@ def test_detail_availability_for_anonymous_user(client, detail_url):
     assert response.status_code == HTTPStatus.OK
 
 
+def test_archive_availability_for_anonymous_user(client, news):
+    # Arrange
+    url = reverse('news:archive')
+
+    # Act
+    response = client.get(url)
+
+    # Assert
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_archive_with_broken_cursor(client):
+    # Arrange
+    url = reverse('news:archive')
+
+    # Act
+    response = client.get(url, {'after': 'не-курсор'})
+
+    # Assert
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
 def test_login_page_availability(client, login_url):
     # Arrange
     # (данные подготовлены фикстурами)
@@ -103,3 +129,86 @@ def test_redirect_for_anonymous_client(
 
     # Assert
     assertRedirects(response, expected_url)
+
+
+@pytest.mark.parametrize('url', (
+    pytest_lazyfixture.lazy_fixture('home_url'),
+    pytest_lazyfixture.lazy_fixture('detail_url'),
+))
+@pytest.mark.parametrize('user_client', (
+    pytest_lazyfixture.lazy_fixture('client'),
+    pytest_lazyfixture.lazy_fixture('author_client'),
+))
+def test_not_modified_for_same_etag(user_client, url):
+    # Arrange
+    etag = user_client.get(url)['ETag']
+
+    # Act
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    # Assert
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_new_comment_changes_detail_etag(client, author, news, detail_url):
+    # Arrange
+    etag = client.get(detail_url)['ETag']
+    Comment.objects.create(news=news, author=author, text='Текст')
+
+    # Act
+    response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+
+    # Assert
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_deleted_comment_changes_detail_last_modified(
+    client, comment, detail_url
+):
+    # Arrange
+    # Last-Modified точен до секунды, поэтому сдвигаем прошлые правки.
+    an_hour_ago = timezone.now() - timedelta(hours=1)
+    News.objects.update(modified=an_hour_ago, last_comment_at=an_hour_ago)
+    last_modified = client.get(detail_url)['Last-Modified']
+    comment.delete()
+
+    # Act
+    response = client.get(detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+    # Assert
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_anonymous_etag_does_not_match_for_user(
+    client, author_client, detail_url
+):
+    # Arrange
+    anonymous = client.get(detail_url)
+
+    # Act
+    response = author_client.get(
+        detail_url,
+        HTTP_IF_NONE_MATCH=anonymous['ETag'],
+        HTTP_IF_MODIFIED_SINCE=anonymous['Last-Modified'],
+    )
+
+    # Assert
+    assert response.status_code == HTTPStatus.OK
+    assert 'Last-Modified' not in response
+
+
+def test_login_again_changes_user_etag(
+    client, django_user_model, login_url, detail_url
+):
+    # Arrange
+    credentials = {'username': 'Читатель', 'password': 'Пароль-для-входа'}
+    django_user_model.objects.create_user(**credentials)
+    client.post(login_url, credentials)
+    etag = client.get(detail_url)['ETag']
+    client.post(login_url, credentials)
+
+    # Act
+    response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+
+    # Assert
+    assert response.status_code == HTTPStatus.OK
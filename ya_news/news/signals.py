@@ -0,0 +1,95 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import Case, F, OuterRef, Subquery, Value, When
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_content_version
+from .instrumentation import observe_query
+from .models import Comment, News
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_pages(**kwargs):
+    """
+    Новая версия содержимого после любой записи.
+
+    Версию меняем только после фиксации транзакции: иначе параллельный
+    запрос успел бы закешировать старые данные под новой версией.
+    """
+    transaction.on_commit(bump_content_version)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(instance, created, raw=False, **kwargs):
+    """
+    Новый комментарий увеличивает счётчик новости.
+
+    Значения меняются выражениями F() в одном UPDATE, поэтому
+    параллельные комментарии не затирают друг друга. Правка
+    комментария меняет время изменения новости: иначе ETag
+    страницы новости остался бы прежним. Фикстуры (raw) уже
+    содержат готовые счётчики, их не трогаем.
+    """
+    if raw:
+        return
+    news = News.objects.filter(pk=instance.news_id)
+    if not created:
+        news.update(modified=timezone.now())
+        return
+    news.update(
+        comment_count=F('comment_count') + 1,
+        last_comment_at=Case(
+            When(
+                last_comment_at__gt=instance.created,
+                then=F('last_comment_at'),
+            ),
+            default=Value(instance.created),
+        ),
+    )
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(instance, origin=None, raw=False, **kwargs):
+    """
+    Удаление комментария уменьшает счётчик и меняет время изменения.
+
+    Иначе после удаления Last-Modified страницы новости остался бы
+    прежним и клиент получил бы 304 со старым списком комментариев.
+    Время последнего комментария берётся из оставшихся комментариев.
+    При удалении самой новости обновлять нечего, как и при записи
+    сырых данных.
+    """
+    if raw or isinstance(origin, News):
+        return
+    if getattr(origin, 'model', None) is News:
+        return
+    News.objects.filter(pk=instance.news_id).update(
+        comment_count=F('comment_count') - 1,
+        last_comment_at=Subquery(
+            Comment.objects.filter(news=OuterRef('pk'))
+            .order_by('-created').values('created')[:1]
+        ),
+        modified=timezone.now(),
+    )
+
+
+@receiver(connection_created)
+def install_execute_wrapper(connection, **kwargs):
+    """
+    Обёртка замеров на каждом соединении с базой.
+
+    У каждого потока своё соединение, а под ASGI представления ходят
+    в базу не из того потока, где работает middleware, поэтому
+    обёртка ставится здесь, а middleware только включают замеры через
+    ContextVar. Список обёрток соединения переживает переподключение,
+    поэтому повторно она не добавляется. Ставится она в начало списка:
+    connection.execute_wrapper() снимает последнюю обёртку, и соединение,
+    открытое внутри такого блока, не должно её подменить.
+    """
+    if observe_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, observe_query)
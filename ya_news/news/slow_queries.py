@@ -0,0 +1,168 @@
+import heapq
+import logging
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger('news.slow_queries')
+
+# Запрос, который сейчас обрабатывается: из него берётся имя маршрута.
+current_request = ContextVar('news_slow_query_request', default=None)
+
+# Модули замеров: их строки не считаются источником запроса.
+INSTRUMENTATION = (
+    'news.instrumentation', 'news.slow_queries', 'news.timing',
+    'news.nplusone',
+)
+
+# Самые медленные запросы к базе по маршрутам в текущем процессе.
+slow_queries = {}
+slow_queries_lock = threading.Lock()
+
+
+def find_origin():
+    """
+    Откуда пришёл запрос к базе.
+
+    Возвращает ближайший узел шаблона вида ``news/detail.html:12``
+    и ближайшую строку кода проекта вида ``news/views.py:40 in get``.
+    Модули замеров и обёртки execute вроде time_query пропускаются.
+    Стек просматривается только для медленных и повторных запросов.
+    """
+    project = str(settings.BASE_DIR)
+    template = code = None
+    frame = sys._getframe(1)
+    while frame is not None and (template is None or code is None):
+        filename = frame.f_code.co_filename
+        if template is None and frame.f_code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                name = origin.template_name or origin.name
+                template = f'{name}:{token.lineno}'
+        if (
+            code is None
+            and filename.startswith(project)
+            and frame.f_globals.get('__name__') not in INSTRUMENTATION
+            and frame.f_code.co_name != time_query.__name__
+            and 'site-packages' not in filename
+        ):
+            path = Path(filename).relative_to(project)
+            code = f'{path}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return template, code
+
+
+def record_slow_query(view, query):
+    """Оставляет для маршрута NEWS_SLOW_QUERY_TOP самых медленных."""
+    with slow_queries_lock:
+        top = slow_queries.setdefault(view, [])
+        entry = (query['ms'], id(query), query)
+        if len(top) < settings.NEWS_SLOW_QUERY_TOP:
+            heapq.heappush(top, entry)
+        else:
+            heapq.heappushpop(top, entry)
+
+
+def get_slow_queries():
+    """
+    Самые медленные запросы по маршрутам, от медленных к быстрым.
+
+    Пример: ``{'news:detail': [{'ms': 120.5, 'sql': ..., ...}]}``.
+    """
+    with slow_queries_lock:
+        return {
+            view: [query for _, _, query in sorted(top, reverse=True)]
+            for view, top in slow_queries.items()
+        }
+
+
+def reset_slow_queries():
+    with slow_queries_lock:
+        slow_queries.clear()
+
+
+def time_query(execute, sql, params, many, context):
+    """
+    Обёртка execute, её вызывает instrumentation.observe_query.
+
+    Вне запроса, который отслеживает SlowQueryMiddleware, сразу
+    передаёт запрос дальше.
+    """
+    if current_request.get() is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        ms = (time.perf_counter() - started) * 1000
+        if ms >= settings.NEWS_SLOW_QUERY_MS:
+            report_slow_query(sql, params, ms)
+
+
+def report_slow_query(sql, params, ms):
+    request = current_request.get()
+    match = request.resolver_match if request is not None else None
+    view = match.view_name if match else '-'
+    template, code = find_origin()
+    query = {
+        'ms': round(ms, 1),
+        'sql': sql,
+        'params': repr(params),
+        'view': view,
+        'template': template,
+        'code': code,
+    }
+    record_slow_query(view, query)
+    logger.warning(
+        '%.1f мс %s %s %s %s %s',
+        ms, view, template or '-', code or '-', sql, query['params'],
+        extra=query,
+    )
+
+
+class SlowQueryMiddleware:
+    """
+    Записывает запросы к базе дольше NEWS_SLOW_QUERY_MS миллисекунд.
+
+    Каждый медленный запрос попадает в журнал news.slow_queries вместе
+    с параметрами, маршрутом и местом в шаблоне или коде, откуда он
+    пришёл. Если порог None, middleware ничего не делает.
+
+    Сам middleware только запоминает запрос в current_request, а время
+    замеряет time_query на соединении того потока, где идёт запрос
+    к базе: под ASGI это не поток middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if settings.NEWS_SLOW_QUERY_MS is None:
+            return self.get_response(request)
+        token = current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            current_request.reset(token)
+
+    async def __acall__(self, request):
+        if settings.NEWS_SLOW_QUERY_MS is None:
+            return await self.get_response(request)
+        token = current_request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            current_request.reset(token)
@@ -0,0 +1,72 @@
+from django import template
+from django.conf import settings
+from django.templatetags.cache import CacheNode
+
+from news.cache import record_fragment
+
+register = template.Library()
+
+
+class FragmentMissNode(template.Node):
+    """Первый узел фрагмента: отрисовывается только при промахе кеша."""
+
+    def __init__(self, cache_node):
+        self.cache_node = cache_node
+
+    def render(self, context):
+        context.render_context[self.cache_node] = True
+        return ''
+
+
+class FragmentCacheNode(CacheNode):
+    """
+    Встроенный {% cache %} со счётчиками попаданий и промахов.
+
+    Ключ, выбор кеша и запись берёт на себя CacheNode. Промах замечает
+    FragmentMissNode: содержимое фрагмента отрисовывается только тогда.
+    """
+
+    def __init__(self, nodelist, expire_time_var, fragment_name, vary_on):
+        nodelist.insert(0, FragmentMissNode(self))
+        super().__init__(
+            nodelist, expire_time_var, fragment_name, vary_on, None
+        )
+
+    def render(self, context):
+        context.render_context[self] = False
+        content = super().render(context)
+        record_fragment(
+            self.fragment_name, hit=not context.render_context[self]
+        )
+        return content
+
+
+@register.tag('cachefragment')
+def do_cache_fragment(parser, token):
+    """
+    {% cache %} на NEWS_FRAGMENT_CACHE_TIMEOUT секунд с учётом попаданий.
+
+    Использование::
+
+        {% cachefragment 'news_card' news.pk news.modified %}
+            ...
+        {% endcachefragment %}
+
+    Фрагмент определяется именем и значениями после него: обычно это
+    первичный ключ объекта и время его последнего изменения. Всё, что
+    меняется без изменения объекта, например имя автора, остаётся
+    снаружи фрагмента.
+    """
+    nodelist = parser.parse(('endcachefragment',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]!r} ожидает имя фрагмента и хотя бы одно значение.'
+        )
+    return FragmentCacheNode(
+        nodelist,
+        parser.compile_filter(repr(settings.NEWS_FRAGMENT_CACHE_TIMEOUT)),
+        parser.compile_filter(bits[1]).resolve({}),
+        [parser.compile_filter(bit) for bit in bits[2:]],
+    )
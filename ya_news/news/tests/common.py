@@ -0,0 +1,6 @@
+from django.test import TestCase, override_settings
+
+
+@override_settings(NEWS_NPLUSONE_MAX_REPEATS=3, NEWS_NPLUSONE_RAISE=True)
+class BaseTestCase(TestCase):
+    """Базовый класс тестов: запрос N+1 в представлении роняет тест."""
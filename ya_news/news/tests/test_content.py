@@ -2,17 +2,19 @@ from datetime import datetime, timedelta
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
 from django.urls import reverse
 from django.utils import timezone
 
 from news.forms import CommentForm
 from news.models import Comment, News
 
+from .common import BaseTestCase
+
 User = get_user_model()
 
 
-class TestHomePage(TestCase):
+class TestHomePage(BaseTestCase):
 
     HOME_URL = reverse('news:home')
 
@@ -29,6 +31,9 @@ class TestHomePage(TestCase):
         ]
         News.objects.bulk_create(all_news)
 
+    def setUp(self):
+        cache.clear()
+
     def test_news_count(self):
         response = self.client.get(self.HOME_URL)
         object_list = response.context['object_list']
@@ -43,7 +48,7 @@ class TestHomePage(TestCase):
         self.assertEqual(all_dates, sorted_dates)
 
 
-class TestDetailPage(TestCase):
+class TestDetailPage(BaseTestCase):
 
     @classmethod
     def setUpTestData(cls):
@@ -1,16 +1,18 @@
 from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.test import Client
 from django.urls import reverse
 
 from news.forms import BAD_WORDS, WARNING
 from news.models import Comment, News
 
+from .common import BaseTestCase
+
 User = get_user_model()
 
 
-class TestCommentCreation(TestCase):
+class TestCommentCreation(BaseTestCase):
 
     COMMENT_TEXT = 'Текст комментария'
 
@@ -52,7 +54,7 @@ class TestCommentCreation(TestCase):
         self.assertEqual(comments_count, 0)
 
 
-class TestCommentEditDelete(TestCase):
+class TestCommentEditDelete(BaseTestCase):
 
     COMMENT_TEXT = 'Текст комментария'
     NEW_COMMENT_TEXT = 'Обновлённый комментарий'
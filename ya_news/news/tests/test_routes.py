@@ -1,15 +1,16 @@
 from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
 from django.urls import reverse
 
 from news.models import Comment, News
 
+from .common import BaseTestCase
+
 User = get_user_model()
 
 
-class TestRoutes(TestCase):
+class TestRoutes(BaseTestCase):
 
     @classmethod
     def setUpTestData(cls):
@@ -0,0 +1,87 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+BUCKET_KEY = 'news:throttle:{scope}:{kind}:{ident}'
+PERIODS = {'s': 1, 'min': 60, 'h': 60 * 60, 'day': 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """'20/min' -> (20, 60): ёмкость ведра и время его наполнения."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period]
+
+
+def get_identities(request):
+    """Пользователь и адрес клиента, для каждого своё ведро."""
+    yield 'ip', request.META.get('REMOTE_ADDR', '')
+    if request.user.is_authenticated:
+        yield 'user', request.user.pk
+
+
+def take_token(request, scope, now=None):
+    """
+    Забирает токен из вёдер пользователя и адреса.
+
+    Возвращает 0, если запрос можно выполнить, иначе — сколько секунд
+    ждать следующего токена. Состояние ведра — пара (токены, время),
+    токены доливаются при чтении, поэтому фоновых задач нет. На запрос
+    уходит одно чтение всех вёдер, а при успехе ещё одна запись.
+
+    Чтение и запись не атомарны: параллельные запросы одного клиента
+    изредка могут получить на токен больше. Для защиты от шквала
+    запросов этого достаточно.
+    """
+    now = time.time() if now is None else now
+    rates = settings.NEWS_THROTTLE_RATES.get(scope, {})
+    buckets = {}
+    for kind, ident in get_identities(request):
+        if rates.get(kind):
+            key = BUCKET_KEY.format(scope=scope, kind=kind, ident=ident)
+            buckets[key] = parse_rate(rates[kind])
+    if not buckets:
+        return 0
+    states = cache.get_many(buckets.keys())
+    updated = {}
+    wait = 0
+    for key, (capacity, period) in buckets.items():
+        tokens, last = states.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - last) * capacity / period)
+        if tokens < 1:
+            wait = max(wait, (1 - tokens) * period / capacity)
+        updated[key] = (tokens - 1, now)
+    if wait:
+        return wait
+    # Ведро, которое не трогали целый период, снова полное.
+    cache.set_many(updated, max(period for _, period in buckets.values()))
+    return 0
+
+
+def too_many_requests(wait):
+    response = HttpResponse(
+        'Слишком много запросов, попробуйте позже.', status=429
+    )
+    response['Retry-After'] = math.ceil(wait)
+    return response
+
+
+class ThrottleMixin:
+    """
+    Ограничивает частоту запросов к представлению.
+
+    Ставится после LoginRequiredMixin. Частоты задаются в настройке
+    NEWS_THROTTLE_RATES для throttle_scope, отдельно для пользователя
+    и для адреса клиента. Сверх частоты отвечает 429 с Retry-After.
+    """
+    throttle_scope = None
+    throttle_methods = ('POST',)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in self.throttle_methods:
+            wait = take_token(request, self.throttle_scope)
+            if wait:
+                return too_many_requests(wait)
+        return super().dispatch(request, *args, **kwargs)
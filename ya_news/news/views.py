@@ -1,13 +1,27 @@
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import F
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
+from .cache import cache_anonymous_page
+from .conditional import (
+    detail_etag, detail_last_modified, home_etag, home_last_modified
+)
 from .forms import CommentForm
 from .models import Comment, News
+from .pagination import KeysetPaginator
+from .throttling import ThrottleMixin
 
 
+@method_decorator(
+    condition(etag_func=home_etag, last_modified_func=home_last_modified),
+    name='get',
+)
+@method_decorator(cache_anonymous_page, name='get')
 class NewsList(generic.ListView):
     """Список новостей."""
     model = News
@@ -18,22 +32,68 @@ class NewsList(generic.ListView):
         Выводим только несколько последних новостей.
 
         Их количество определяется в настройках проекта.
+        Количество комментариев хранится в самой новости,
+        сами комментарии не загружаются.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return self.model.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE]
 
 
-class NewsDetail(generic.DetailView):
+class NewsArchive(generic.ListView):
+    """
+    Архив всех новостей.
+
+    Страницы листаются курсором по ключу (date, id), поэтому глубокие
+    страницы стоят столько же, сколько первая.
+    """
     model = News
-    template_name = 'news/detail.html'
+    template_name = 'news/archive.html'
+    ordering = ('-date', '-id')
+
+    def get_queryset(self):
+        return self.model.objects.defer('text')
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, self.ordering, page_size)
+        page = paginator.get_page(self.request.GET.get('after'))
+        return paginator, page, page.object_list, page.has_next()
+
+    def get_paginate_by(self, queryset):
+        return settings.NEWS_COUNT_ON_ARCHIVE_PAGE
+
+
+def get_comment_paginator(news):
+    """
+    Комментарии новости по ключу (created, id).
 
-    def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
+    Вместо объектов авторов подтягиваем JOIN-ом только имя.
+    """
+    comments = Comment.objects.filter(news=news).annotate(
+        author_username=F('author__username')
+    ).only('id', 'author_id', 'text', 'created', 'modified')
+    return KeysetPaginator(
+        comments, ('created', 'id'), settings.COMMENTS_COUNT_ON_DETAIL_PAGE
+    )
+
+
+class CommentPageMixin:
+    """Страница комментариев новости в контексте шаблона."""
+
+    def get_comments_cursor(self):
+        return None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = get_comment_paginator(self.object).get_page(
+            self.get_comments_cursor()
         )
-        return obj
+        context['comments'] = page.object_list
+        context['comments_page'] = page
+        return context
+
+
+class NewsDetail(CommentPageMixin, generic.DetailView):
+    model = News
+    template_name = 'news/detail.html'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -42,33 +102,51 @@ class NewsDetail(generic.DetailView):
         return context
 
 
+class NewsComments(CommentPageMixin, generic.DetailView):
+    """Следующие страницы комментариев к новости."""
+    model = News
+    template_name = 'news/comments.html'
+
+    def get_comments_cursor(self):
+        return self.request.GET.get('after')
+
+
 class NewsComment(
         LoginRequiredMixin,
+        ThrottleMixin,
+        CommentPageMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
     model = News
     form_class = CommentForm
     template_name = 'news/detail.html'
+    throttle_scope = 'comment'
 
     def post(self, request, *args, **kwargs):
         self.object = self.get_object()
         return super().post(request, *args, **kwargs)
 
     def form_valid(self, form):
+        """Комментарий и счётчик новости сохраняются вместе."""
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        with transaction.atomic():
+            comment.save()
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
 
+    @method_decorator(condition(
+        etag_func=detail_etag, last_modified_func=detail_last_modified
+    ))
     def get(self, request, *args, **kwargs):
         view = NewsDetail.as_view()
         return view(request, *args, **kwargs)
@@ -83,14 +161,21 @@ class CommentBase(LoginRequiredMixin):
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
+        """Комментарий уже загружен, а новость нужна только по ключу."""
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
-        """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        """
+        Пользователь может работать только со своими комментариями.
+
+        Заголовок новости показывают страницы редактирования и удаления,
+        поэтому новость загружаем тем же запросом.
+        """
+        return self.model.objects.filter(
+            author=self.request.user
+        ).select_related('news')
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
@@ -102,3 +187,8 @@ class CommentUpdate(CommentBase, generic.UpdateView):
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+    def form_valid(self, form):
+        """Удаление и пересчёт счётчиков новости — одна транзакция."""
+        with transaction.atomic():
+            return super().form_valid(form)
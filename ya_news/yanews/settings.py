@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -21,6 +22,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'news.slow_queries.SlowQueryMiddleware',
+    'news.nplusone.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,10 +54,50 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
+# Настройки каждого соединения с SQLite. В режиме WAL читатели не ждут
+# пишущего, а synchronous=NORMAL в этом режиме не портит базу при сбое,
+# лишь может потерять последние транзакции. Размеры — в байтах,
+# cache_size со знаком минус — в КиБ.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение переживает запрос, а перед повторным
+        # использованием проверяется.
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Транзакция берёт блокировку записи сразу. Иначе две
+            # транзакции, начавшие с чтения, не могут обе перейти
+            # к записи, и одна падает с «database is locked», не
+            # дожидаясь timeout.
+            'transaction_mode': 'IMMEDIATE',
+            # Сколько секунд ждать чужую блокировку (busy_timeout).
+            'timeout': 20,
+            'init_command': ';'.join(
+                f'PRAGMA {name} = {value}'
+                for name, value in SQLITE_PRAGMAS.items()
+            ),
+        },
+    }
+}
+
+# Подойдёт и файловый кеш, если страницы нужно делить между процессами:
+# 'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+# 'LOCATION': BASE_DIR / 'cache',
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        # Фрагменты комментариев занимают по записи на комментарий.
+        'OPTIONS': {'MAX_ENTRIES': 100_000},
     }
 }
 
@@ -80,3 +123,82 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+NEWS_COUNT_ON_ARCHIVE_PAGE = 20
+
+COMMENTS_COUNT_ON_DETAIL_PAGE = 50
+
+# Асинхронные варианты главной и страницы новости. Включайте при
+# запуске под ASGI: тогда чтение обходится без потоков. Под WSGI
+# каждый асинхронный запрос запускал бы свой цикл событий.
+NEWS_ASYNC_VIEWS = False
+
+NEWS_PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+
+NEWS_FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+# Частоты записи по областям: ёмкость ведра токенов и время,
+# за которое оно наполняется, отдельно для пользователя и адреса.
+NEWS_THROTTLE_RATES = {
+    'comment': {'user': '20/min', 'ip': '60/min'},
+}
+
+# Заголовок Server-Timing и строка в журнале news.timing для доли
+# запросов. Включаются переменной окружения NEWS_SERVER_TIMING.
+if os.environ.get('NEWS_SERVER_TIMING') == '1':
+    MIDDLEWARE.insert(0, 'news.timing.ServerTimingMiddleware')
+
+NEWS_TIMING_SAMPLE_RATE = float(
+    os.environ.get('NEWS_TIMING_SAMPLE_RATE', 0.01)
+)
+
+# Запросы к базе дольше порога в миллисекундах пишутся
+# в slow_queries.log с маршрутом и строкой шаблона или кода.
+# Порог задаёт переменная окружения NEWS_SLOW_QUERY_MS,
+# без неё (None) запись отключена.
+NEWS_SLOW_QUERY_MS = (
+    float(os.environ['NEWS_SLOW_QUERY_MS'])
+    if os.environ.get('NEWS_SLOW_QUERY_MS') else None
+)
+
+# Каталог журналов, задаётся переменной окружения NEWS_LOG_DIR.
+LOG_DIR = Path(os.environ.get('NEWS_LOG_DIR', BASE_DIR))
+
+# Сколько самых медленных запросов помнить для каждого маршрута.
+NEWS_SLOW_QUERY_TOP = 10
+
+# Сколько раз один и тот же SELECT может выполниться за запрос,
+# прежде чем считаться N+1. В отладке повторы пишутся в журнал
+# news.nplusone, в тестах ещё и роняют тест. None отключает поиск.
+NEWS_NPLUSONE_MAX_REPEATS = 3 if DEBUG else None
+
+NEWS_NPLUSONE_RAISE = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': LOG_DIR / 'slow_queries.log',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'news.timing': {'handlers': ['console'], 'level': 'INFO'},
+        'news.nplusone': {'handlers': ['console'], 'level': 'WARNING'},
+        'news.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# Дополнительный словарь запрещённых слов, по слову на строку.
+# Изменения файла подхватываются без перезапуска.
+BAD_WORDS_FILE = BASE_DIR / 'bad_words.txt'
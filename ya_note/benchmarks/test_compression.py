@@ -0,0 +1,95 @@
+"""
+Сжатие текстов заметок: место в базе против времени чтения.
+
+Запуск: pytest benchmarks/test_compression.py -s
+"""
+import random
+
+import pytest
+from django.db import connection
+
+from notes.models import Note
+
+from .conftest import measure
+
+pytestmark = pytest.mark.django_db
+
+NOTE_COUNT = 2_000
+LINES_PER_NOTE = 300
+BATCH_SIZE = 500
+READS = 500
+# Во сколько раз таблица сжатых заметок должна быть меньше.
+SIZE_REDUCTION_LIMIT = 3
+# Во сколько раз чтение сжатой заметки может быть медленнее.
+READ_SLOWDOWN_LIMIT = 2
+
+
+def make_log(generator):
+    return '\n'.join(
+        f'2024-05-{generator.randint(1, 28):02d} '
+        f'{generator.randint(0, 23):02d}:{generator.randint(0, 59):02d} '
+        f'{generator.choice(("INFO", "WARNING", "ERROR"))} '
+        f'worker-{generator.randint(1, 16)}: '
+        f'запрос {generator.randint(1, 10 ** 6)} '
+        f'обработан за {generator.randint(1, 5000)} мс'
+        for _ in range(LINES_PER_NOTE)
+    )
+
+
+def table_size():
+    """Байты страниц таблицы заметок, без индексов и поискового индекса."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT SUM(pgsize) FROM dbstat WHERE name = 'notes_note'"
+        )
+        return cursor.fetchone()[0]
+
+
+def fill(author, texts):
+    Note.objects.all().delete()
+    Note.objects.bulk_create(
+        (
+            Note(title='Лог', text=text, slug=f'log-{index}', author=author)
+            for index, text in enumerate(texts)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    pks = Note.objects.order_by('id').values_list('pk', flat=True)[:READS]
+    return table_size(), list(pks)
+
+
+def read(pks):
+    with measure() as detail:
+        for pk in pks:
+            len(Note.objects.get(pk=pk).text)
+    with measure() as listing:
+        list(Note.objects.only('id', 'slug', 'title'))
+    return detail, listing
+
+
+def test_compression_cost(author, monkeypatch):
+    generator = random.Random(0)
+    texts = [make_log(generator) for _ in range(NOTE_COUNT)]
+    field = Note._meta.get_field('text')
+
+    monkeypatch.setattr(field, 'compress_above', float('inf'))
+    plain_size, pks = fill(author, texts)
+    plain_detail, plain_list = read(pks)
+    monkeypatch.undo()
+    compressed_size, pks = fill(author, texts)
+    compressed_detail, compressed_list = read(pks)
+
+    for name, size, detail, listing in (
+        ('без сжатия', plain_size, plain_detail, plain_list),
+        ('со сжатием', compressed_size, compressed_detail, compressed_list),
+    ):
+        print(
+            f'\n{NOTE_COUNT} заметок {name}: таблица '
+            f'{size / 2 ** 20:.1f} МиБ, чтение заметки '
+            f'{detail.seconds / READS * 1000:.2f} мс, список '
+            f'{listing.seconds * 1000:.0f} мс'
+        )
+    assert compressed_size * SIZE_REDUCTION_LIMIT <= plain_size
+    assert compressed_detail.seconds <= (
+        plain_detail.seconds * READ_SLOWDOWN_LIMIT
+    )
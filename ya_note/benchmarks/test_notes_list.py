@@ -0,0 +1,64 @@
+"""
+Стоимость списка заметок у пользователя с большой коллекцией.
+
+Запуск: pytest benchmarks/test_notes_list.py -s
+"""
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.test.client import Client
+from django.urls import reverse
+
+from notes.models import Note
+
+from .conftest import measure
+
+pytestmark = pytest.mark.django_db
+
+NOTES_PER_USER = (100, 10_000, 100_000)
+BATCH_SIZE = 10_000
+TEXT = 'Длинный текст заметки. ' * 100
+# Во сколько раз страница в конце коллекции может быть медленнее первой.
+DEEP_PAGE_SLOWDOWN_LIMIT = 3
+
+
+def test_notes_list_cost(author):
+    client = Client()
+    client.force_login(author)
+    url = reverse('notes:list')
+    created = 0
+    for count in NOTES_PER_USER:
+        Note.objects.bulk_create(
+            (
+                Note(
+                    title=f'Заметка {index}', text=TEXT,
+                    slug=f'note-{index}', author=author,
+                )
+                for index in range(created, count)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        created = count
+        deep_note = Note.objects.filter(author=author).order_by('-id')[
+            settings.NOTES_COUNT_ON_LIST_PAGE
+        ]
+        deep_cursor = deep_note.id
+
+        # bulk_create не отправляет сигналы, которые сбрасывают кеш страниц.
+        cache.clear()
+        with measure() as first:
+            client.get(url)
+        cache.clear()
+        with measure() as deep:
+            response = client.get(url, {'after': deep_cursor})
+
+        assert len(response.context['object_list']) == (
+            settings.NOTES_COUNT_ON_LIST_PAGE
+        )
+        print(
+            f'\n{count:>7} заметок: первая страница '
+            f'{first.seconds * 1000:.1f} мс, последняя '
+            f'{deep.seconds * 1000:.1f} мс, {deep.queries} запросов, '
+            f'пик памяти {deep.peak_memory / 1024:.0f} КиБ'
+        )
+        assert deep.seconds <= first.seconds * DEEP_PAGE_SLOWDOWN_LIMIT
@@ -0,0 +1,57 @@
+"""
+Страницы заметок из кеша против отрисовки с запросами к базе.
+
+Запуск: pytest benchmarks/test_page_cache.py -s
+"""
+import pytest
+from django.core.cache import cache
+from django.test.client import Client
+from django.urls import reverse
+
+from notes.cache import get_page_stats, reset_page_stats
+from notes.models import Note
+
+from .conftest import measure
+
+pytestmark = pytest.mark.django_db
+
+NOTE_COUNT = 1_000
+REQUESTS = 200
+# Во сколько раз страница из кеша должна отдаваться быстрее.
+SPEEDUP_LIMIT = 1.5
+
+
+def test_page_cache_cost(author):
+    Note.objects.bulk_create(
+        Note(
+            title=f'Заметка {index}', text='Текст заметки. ' * 100,
+            slug=f'note-{index}', author=author,
+        )
+        for index in range(NOTE_COUNT)
+    )
+    client = Client()
+    client.force_login(author)
+    urls = [reverse('notes:list')] + [
+        reverse('notes:detail', args=(f'note-{index}',))
+        for index in range(REQUESTS - 1)
+    ]
+    client.get(urls[0])
+
+    cache.clear()
+    with measure() as cold:
+        for url in urls:
+            client.get(url)
+    reset_page_stats()
+    with measure() as warm:
+        for url in urls:
+            client.get(url)
+
+    stats = get_page_stats()
+    print(
+        f'\n{REQUESTS} страниц: без кеша {cold.seconds * 1000:.0f} мс, '
+        f'{cold.queries} запросов; из кеша {warm.seconds * 1000:.0f} мс, '
+        f'{warm.queries} запросов, доля попаданий {stats["ratio"]:.0%}'
+    )
+    assert stats['ratio'] == 1.0
+    assert warm.queries < cold.queries
+    assert warm.seconds * SPEEDUP_LIMIT <= cold.seconds
@@ -0,0 +1,90 @@
+"""
+Планы и время запросов каждой страницы на большом наборе данных.
+
+Падает, если запрос читает большую таблицу целиком или сортирует
+результат во временном B-дереве вместо чтения индекса по порядку.
+
+Запуск: pytest benchmarks/test_query_plans.py -s
+"""
+import re
+import time
+
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note
+
+from .conftest import explain
+
+pytestmark = pytest.mark.django_db
+
+USER_COUNT = 1_000
+NOTES_PER_USER = 500
+AUTHOR_NOTES = 2_000
+BATCH_SIZE = 10_000
+BIG_TABLES = ('notes_note',)
+FULL_SCAN = re.compile(rf'^SCAN ({"|".join(BIG_TABLES)})$')
+
+
+def create_dataset(author, django_user_model):
+    users = django_user_model.objects.bulk_create(
+        django_user_model(username=f'user-{index}')
+        for index in range(USER_COUNT)
+    )
+    Note.objects.bulk_create(
+        (
+            Note(
+                title='Заметка',
+                text='Текст',
+                slug=f'user-{user.pk}-note-{index}',
+                author=user,
+            )
+            for user in users
+            for index in range(NOTES_PER_USER)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    Note.objects.bulk_create(
+        (
+            Note(
+                title='Заметка', text='Текст', slug=f'author-note-{index}',
+                author=author,
+            )
+            for index in range(AUTHOR_NOTES)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+def test_views_use_indexes(author, django_user_model):
+    create_dataset(author, django_user_model)
+    client = Client()
+    client.force_login(author)
+    slug = 'author-note-0'
+    pages = (
+        ('notes:list', ()),
+        ('notes:detail', (slug,)),
+        ('notes:edit', (slug,)),
+        ('notes:delete', (slug,)),
+    )
+    problems = []
+    for name, args in pages:
+        url = reverse(name, args=args)
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as context:
+            client.get(url)
+        elapsed = time.perf_counter() - started
+        print(f'\n{name} {url}: {elapsed * 1000:.1f} мс')
+        for query in context.captured_queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            plan = explain(query['sql'])
+            print(f'  {query["time"]} с: {query["sql"][:100]}')
+            for step in plan:
+                print(f'    {step}')
+                if FULL_SCAN.match(step) or 'TEMP B-TREE' in step:
+                    problems.append((name, step, query['sql']))
+    assert not problems
@@ -0,0 +1,144 @@
+"""
+Стоимость каждого именованного маршрута на большом наборе данных.
+
+Маршруты обходятся анонимом, автором заметок и читателем. Замеры
+сравниваются с базовыми значениями из route_baselines.json: код ответа,
+число запросов и размер ответа. Время зависит от машины, поэтому
+только печатается.
+
+Запуск: pytest benchmarks/test_routes.py -s
+Записать новые базовые значения, в том числе для новых маршрутов:
+BENCHMARK_UPDATE_BASELINES=1 pytest benchmarks/test_routes.py -s
+Без этой переменной файл не меняется, а маршрут без базового значения
+считается ошибкой.
+"""
+import io
+import json
+import os
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Count
+from django.test.client import Client
+from django.urls import reverse
+
+from notes.models import Note
+
+from .conftest import measure, named_routes
+
+pytestmark = pytest.mark.django_db
+
+BASELINES = Path(__file__).with_name('route_baselines.json')
+DATASET = {'users': 2_000, 'notes': 100_000, 'seed': 0}
+NAMESPACES = ('notes', 'users')
+# Параметры строки запроса для маршрутов, которым они нужны.
+QUERY = {'notes:search': {'q': 'молоко хлеб'}}
+REPEATS = 5
+# Поля замера, которые хранятся в базовых значениях и сравниваются.
+BASELINE_FIELDS = ('status', 'queries', 'bytes')
+# Допустимый рост размера ответа, число запросов расти не должно вовсе.
+SIZE_LIMIT = 1.1
+
+
+def get_clients():
+    """
+    Анонимный клиент, самый активный автор заметок и читатель.
+
+    У читателя своих заметок нет, поэтому чужие ему недоступны.
+    """
+    User = get_user_model()
+    author = User.objects.annotate(
+        note_count=Count('note')
+    ).order_by('-note_count').first()
+    reader = User.objects.create(username='Читатель')
+    clients = {'anonymous': Client()}
+    for name, user in (('author', author), ('reader', reader)):
+        clients[name] = Client()
+        clients[name].force_login(user)
+    slug = Note.objects.filter(author=author).latest('id').slug
+    kwargs = {
+        'notes:edit': {'slug': slug},
+        'notes:detail': {'slug': slug},
+        'notes:delete': {'slug': slug},
+        'notes:export': {'file_format': 'jsonl'},
+    }
+    return clients, kwargs
+
+
+def measure_route(client, url, data=None):
+    """
+    Лучший из нескольких запросов к маршруту с пустым кешем.
+
+    Минимум меньше медианы зависит от посторонней нагрузки на машину.
+    Первый запрос не учитывается: он загружает шаблоны.
+    """
+    client.get(url, data)
+    results = []
+    for _ in range(REPEATS):
+        cache.clear()
+        with measure() as result:
+            response = client.get(url, data)
+            size = len(response.getvalue())
+        results.append(result)
+    return {
+        'status': response.status_code,
+        'seconds': round(min(item.seconds for item in results), 6),
+        'db_seconds': round(min(item.db_seconds for item in results), 6),
+        'queries': max(item.queries for item in results),
+        'bytes': size,
+    }
+
+
+def find_regressions(route, current, baseline):
+    problems = []
+    if current['status'] != baseline['status']:
+        problems.append(
+            f'код ответа {baseline["status"]} -> {current["status"]}'
+        )
+    if current['queries'] > baseline['queries']:
+        problems.append(
+            f'запросов {baseline["queries"]} -> {current["queries"]}'
+        )
+    if current['bytes'] > baseline['bytes'] * SIZE_LIMIT:
+        problems.append(f'байт {baseline["bytes"]} -> {current["bytes"]}')
+    return [f'{route}: {problem}' for problem in problems]
+
+
+def test_routes_do_not_regress():
+    call_command('generate_data', stdout=io.StringIO(), **DATASET)
+    clients, kwargs = get_clients()
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    update = os.environ.get('BENCHMARK_UPDATE_BASELINES') == '1'
+    problems = []
+    print()
+    for name, parameters in named_routes(NAMESPACES):
+        assert set(parameters) == set(kwargs.get(name, ())), (
+            f'Нет параметров для маршрута {name}'
+        )
+        url = reverse(name, kwargs=kwargs.get(name))
+        for client_name, client in clients.items():
+            route = f'{name} {client_name}'
+            current = measure_route(client, url, QUERY.get(name))
+            print(
+                f'{route:<28} {current["status"]} '
+                f'{current["seconds"] * 1000:>7.1f} мс, '
+                f'БД {current["db_seconds"] * 1000:>6.1f} мс, '
+                f'{current["queries"]:>2} запросов, '
+                f'{current["bytes"]:>7} байт'
+            )
+            if update:
+                baselines[route] = {
+                    field: current[field] for field in BASELINE_FIELDS
+                }
+            elif route not in baselines:
+                problems.append(f'{route}: нет базового значения')
+            else:
+                problems += find_regressions(route, current, baselines[route])
+    if update:
+        BASELINES.write_text(
+            json.dumps(baselines, indent=2, sort_keys=True) + '\n'
+        )
+    assert not problems, '\n'.join(problems)
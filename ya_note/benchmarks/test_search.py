@@ -0,0 +1,113 @@
+"""
+Полнотекстовый поиск против icontains на миллионе заметок.
+
+Запуск: pytest benchmarks/test_search.py -s
+"""
+import itertools
+import random
+
+import pytest
+from django.conf import settings
+from django.db.models import Q
+
+from notes.models import Note
+from notes.search import rebuild_index, search_notes
+
+from .conftest import measure
+
+pytestmark = pytest.mark.django_db
+
+USER_COUNT = 100
+NOTES_PER_USER = 9_000
+AUTHOR_NOTES = 100_000
+BATCH_SIZE = 10_000
+WORDS_PER_NOTE = 40
+VOCABULARY_SIZE = 50_000
+LETTERS = 'абвгдежзиклмнопрстуфхцчшэюя'
+# Частоты слов убывают по закону Ципфа, как в обычном тексте.
+CUM_WEIGHTS = list(itertools.accumulate(
+    1 / rank for rank in range(1, VOCABULARY_SIZE + 1)
+))
+# Номера слов в словаре: редкие запросы icontains проверяет по всем
+# заметкам автора, частые он заканчивает на первой же странице.
+SELECTIVE_QUERIES = ((5_000,), (40_000,), (300, 2_000))
+COMMON_QUERIES = ((0,), (10,), (1, 50))
+# Во сколько раз поиск по индексу быстрее icontains на редких словах.
+SPEEDUP_LIMIT = 10
+# Сколько секунд допустимо на частые слова: ранжировать приходится
+# все совпадения, а не первую страницу.
+COMMON_QUERY_LIMIT = 0.5
+
+
+def make_vocabulary(generator):
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add(''.join(generator.choices(LETTERS, k=generator.randint(
+            4, 10
+        ))))
+    return sorted(words, key=lambda word: generator.random())
+
+
+def make_notes(author, count, vocabulary, generator):
+    for index in range(count):
+        words = generator.choices(
+            vocabulary, cum_weights=CUM_WEIGHTS, k=WORDS_PER_NOTE
+        )
+        yield Note(
+            title=' '.join(words[:3]), text=' '.join(words),
+            slug=f'{author.pk}-{index}', author=author,
+        )
+
+
+def icontains(author, query):
+    condition = Q(author=author)
+    for word in query.split():
+        condition &= Q(title__icontains=word) | Q(text__icontains=word)
+    return list(Note.objects.filter(condition).only('id', 'slug', 'title')[
+        :settings.NOTES_SEARCH_RESULTS
+    ])
+
+
+def test_search_cost(author, django_user_model):
+    generator = random.Random(0)
+    vocabulary = make_vocabulary(generator)
+    users = django_user_model.objects.bulk_create(
+        django_user_model(username=f'user-{index}')
+        for index in range(USER_COUNT)
+    )
+    for user in users:
+        Note.objects.bulk_create(
+            make_notes(user, NOTES_PER_USER, vocabulary, generator),
+            batch_size=BATCH_SIZE,
+        )
+    Note.objects.bulk_create(
+        make_notes(author, AUTHOR_NOTES, vocabulary, generator),
+        batch_size=BATCH_SIZE,
+    )
+    with measure() as rebuild:
+        rebuild_index()
+    print(
+        f'\n{Note.objects.count()} заметок, перестройка индекса '
+        f'{rebuild.seconds:.1f} с'
+    )
+
+    for ranks in SELECTIVE_QUERIES + COMMON_QUERIES:
+        query = ' '.join(vocabulary[rank] for rank in ranks)
+        with measure() as scan:
+            scanned = icontains(author, query)
+        with measure() as indexed:
+            found = search_notes(author, query, settings.NOTES_SEARCH_RESULTS)
+
+        print(
+            f'«{query}»: icontains {scan.seconds * 1000:.1f} мс '
+            f'({len(scanned)}), FTS5 {indexed.seconds * 1000:.1f} мс '
+            f'({len(found)}), {indexed.queries} запрос'
+        )
+        assert indexed.queries == 1
+        assert {note.pk for note in found} <= set(
+            Note.objects.filter(author=author).values_list('pk', flat=True)
+        )
+        if ranks in SELECTIVE_QUERIES:
+            assert indexed.seconds * SPEEDUP_LIMIT <= scan.seconds
+        else:
+            assert indexed.seconds <= COMMON_QUERY_LIMIT
@@ -0,0 +1,39 @@
+"""
+Подбор slug, когда много заметок делят несколько заголовков.
+
+Запуск: pytest benchmarks/test_slugs.py -s
+"""
+import time
+
+import pytest
+
+from notes.models import Note
+
+pytestmark = pytest.mark.django_db
+
+NOTES = 100_000
+TITLES = ('Список покупок', 'Идеи', 'Дела на завтра', 'Без названия', 'Я')
+REPORT_EVERY = 20_000
+
+
+def test_allocation_cost_stays_flat(author):
+    started = time.perf_counter()
+    window_started = started
+    for index in range(1, NOTES + 1):
+        Note.objects.create(
+            title=TITLES[index % len(TITLES)], text='Текст', author=author
+        )
+        if index % REPORT_EVERY == 0:
+            now = time.perf_counter()
+            print(
+                f'\n{index:>7} заметок: '
+                f'{REPORT_EVERY / (now - window_started):.0f} заметок/с'
+            )
+            window_started = now
+    elapsed = time.perf_counter() - started
+
+    per_title = NOTES // len(TITLES)
+    last = Note.objects.filter(title=TITLES[0]).latest('id')
+    print(f'всего {NOTES / elapsed:.0f} заметок/с, последний slug {last.slug}')
+    assert last.slug.endswith(f'-{per_title}')
+    assert Note.objects.values('slug').distinct().count() == NOTES
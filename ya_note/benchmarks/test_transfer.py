@@ -0,0 +1,58 @@
+"""
+Загрузка и выгрузка заметок: время и пик памяти от размера файла.
+
+Запуск: pytest benchmarks/test_transfer.py -s
+"""
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.client import Client
+from django.urls import reverse
+
+from notes.models import Note
+
+from .conftest import measure
+
+pytestmark = pytest.mark.django_db
+
+NOTE_COUNTS = (10_000, 100_000)
+TEXT = 'Длинный текст заметки. ' * 20
+# Во сколько раз может вырасти пик памяти выгрузки при росте коллекции.
+EXPORT_MEMORY_GROWTH_LIMIT = 1.5
+
+
+def make_file(count):
+    return '\n'.join(
+        json.dumps({'title': f'Заметка {index % 100}', 'text': TEXT})
+        for index in range(count)
+    ).encode()
+
+
+def test_transfer_cost(author):
+    client = Client()
+    client.force_login(author)
+    export_peaks = []
+    for count in NOTE_COUNTS:
+        Note.objects.all().delete()
+        upload = SimpleUploadedFile('notes.jsonl', make_file(count))
+
+        with measure() as imported:
+            client.post(
+                reverse('notes:import'),
+                data={'file': upload, 'format': 'jsonl'},
+            )
+        with measure() as exported:
+            response = client.get(reverse('notes:export', args=('jsonl',)))
+            size = sum(len(chunk) for chunk in response.streaming_content)
+
+        assert Note.objects.count() == count
+        print(
+            f'\n{count:>6} заметок: загрузка {imported.seconds:.1f} с '
+            f'({count / imported.seconds:.0f} заметок/с, '
+            f'{imported.queries} запросов), выгрузка '
+            f'{exported.seconds:.1f} с, {size / 2 ** 20:.0f} МиБ, '
+            f'пик памяти {exported.peak_memory / 1024:.0f} КиБ'
+        )
+        export_peaks.append(exported.peak_memory)
+    assert export_peaks[-1] <= export_peaks[0] * EXPORT_MEMORY_GROWTH_LIMIT
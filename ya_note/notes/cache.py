@@ -0,0 +1,123 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .timing import record_cache
+
+USER_VERSION_KEY = 'notes:user-version:{user_id}'
+PAGE_KEY = 'notes:page:{user_id}:{version}:{csrf}:{path}'
+STATS_KEY = 'notes:page-stats:{outcome}'
+OUTCOMES = ('hits', 'misses')
+
+
+def get_user_version(user_id):
+    """
+    Текущая версия заметок пользователя.
+
+    Как и в новостях, начальная версия — текущее время: если счётчик
+    вытеснен из кеша, новая версия не совпадёт со старыми страницами.
+    """
+    return cache.get_or_set(
+        USER_VERSION_KEY.format(user_id=user_id), time.time_ns, None
+    )
+
+
+def bump_user_version(user_id):
+    """Делает устаревшими все закешированные страницы пользователя."""
+    key = USER_VERSION_KEY.format(user_id=user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def get_page_key(request, version):
+    """
+    Ключ страницы пользователя.
+
+    В шапке страницы есть форма выхода с CSRF-токеном, поэтому ключ
+    зависит и от CSRF-cookie: страница, открытая в одном браузере,
+    не попадёт в другой, а после входа, когда cookie меняется,
+    страницы отрисуются заново.
+    """
+    csrf = hashlib.md5(request.META['CSRF_COOKIE'].encode()).hexdigest()
+    return PAGE_KEY.format(
+        user_id=request.user.pk,
+        version=version,
+        csrf=csrf,
+        path=request.get_full_path(),
+    )
+
+
+def cache_user_page(view):
+    """
+    Кеширует страницу целиком для её владельца.
+
+    Ключ содержит версию заметок пользователя, которую меняет каждая
+    запись, поэтому свои изменения пользователь видит сразу.
+    Без CSRF-cookie страница не кешируется: она сама выставляет новую.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (
+            request.method != 'GET'
+            or not request.user.is_authenticated
+            or 'CSRF_COOKIE' not in request.META
+        ):
+            return view(request, *args, **kwargs)
+        key = get_page_key(request, get_user_version(request.user.pk))
+        content = cache.get(key)
+        record_page(content is not None)
+        if content is not None:
+            return HttpResponse(content)
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda response: cache.set(
+                    key, response.content, settings.NOTES_PAGE_CACHE_TIMEOUT
+                )
+            )
+        return response
+    return wrapper
+
+
+def record_page(hit):
+    """
+    Считает попадания и промахи в самом кеше.
+
+    Так счётчики общие для всех процессов, если кеш общий.
+    """
+    record_cache(hit)
+    key = STATS_KEY.format(outcome=OUTCOMES[0] if hit else OUTCOMES[1])
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def get_page_stats():
+    """
+    Статистика кеша страниц заметок.
+
+    Пример: ``{'hits': 990, 'misses': 10, 'ratio': 0.99}``.
+    """
+    values = cache.get_many(
+        [STATS_KEY.format(outcome=outcome) for outcome in OUTCOMES]
+    )
+    stats = {
+        outcome: values.get(STATS_KEY.format(outcome=outcome), 0)
+        for outcome in OUTCOMES
+    }
+    total = stats['hits'] + stats['misses']
+    stats['ratio'] = stats['hits'] / total if total else 0.0
+    return stats
+
+
+def reset_page_stats():
+    cache.delete_many(
+        [STATS_KEY.format(outcome=outcome) for outcome in OUTCOMES]
+    )
@@ -1,8 +1,8 @@
 from django import forms
 from django.core.exceptions import ValidationError
-from pytils.translit import slugify
 
 from .models import Note
+from .transfer import FORMATS
 
 WARNING = ' - такой slug уже существует, придумайте уникальное значение!'
 
@@ -15,14 +15,38 @@ class NoteForm(forms.ModelForm):
         fields = ('title', 'text', 'slug')
 
     def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
-        if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
-        if Note.objects.filter(
-                slug=slug
-        ).exclude(id=self.instance.pk).exists():
-            raise ValidationError(slug + WARNING)
-        return slug
+        """
+        Пустой slug подберёт Note.save() по заголовку.
+
+        Уникальность проверяет индекс базы при сохранении: занятый
+        slug превращается в ошибку формы в NoteSaveMixin.
+        """
+        return self.cleaned_data.get('slug') or ''
+
+    def validate_unique(self):
+        """
+        Slug исключён из стандартной проверки уникальности.
+
+        Запрос exists() не защищает от гонки двух сохранений,
+        поэтому единственной проверкой остаётся уникальный индекс.
+        """
+        exclude = self._get_validation_exclusions()
+        exclude.add('slug')
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except ValidationError as error:
+            self._update_errors(error)
+
+    def add_slug_error(self):
+        """Сообщает, что заданный slug уже занят."""
+        self.add_error('slug', self.cleaned_data['slug'] + WARNING)
+
+
+class NoteImportForm(forms.Form):
+    """Форма загрузки файла с заметками."""
+    file = forms.FileField(label='Файл')
+    format = forms.ChoiceField(
+        label='Формат',
+        choices=[(name, name.upper()) for name in FORMATS],
+        help_text='JSON Lines или CSV с полями title, text и slug',
+    )
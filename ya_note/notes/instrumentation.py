@@ -0,0 +1,24 @@
+from functools import partial
+
+from . import nplusone, slow_queries, timing
+
+# Обёртки execute для замеров запросов к базе и ContextVar, через
+# которые middleware включают их для текущего запроса.
+EXECUTE_WRAPPERS = (
+    (timing.current_timings, timing.time_query),
+    (slow_queries.current_request, slow_queries.time_query),
+    (nplusone.current_counts, nplusone.count_query),
+)
+
+
+def observe_query(execute, sql, params, many, context):
+    """
+    Единственная обёртка execute на соединении с базой.
+
+    Передаёт запрос только замерам, включённым для текущего запроса.
+    Когда все выключены, запрос сразу уходит в базу.
+    """
+    for switch, wrapper in EXECUTE_WRAPPERS:
+        if switch.get() is not None:
+            execute = partial(wrapper, execute)
+    return execute(sql, params, many, context)
@@ -0,0 +1,133 @@
+import functools
+import itertools
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from notes.models import Note
+from notes.search import index_notes
+
+WORDS = (
+    'купить', 'молоко', 'хлеб', 'позвонить', 'маме', 'встреча', 'проект',
+    'отчёт', 'сдать', 'до', 'пятницы', 'идея', 'книга', 'прочитать',
+    'фильм', 'посмотреть', 'врач', 'записаться', 'пароль', 'сервер',
+    'ошибка', 'исправить', 'план', 'отпуск', 'билеты', 'подарок',
+    'список', 'дела', 'спорт', 'тренировка', 'рецепт', 'суп', 'задача',
+)
+LOG_LINE = '{time} INFO worker-{worker} обработано задач: {count}\n'
+# Показатель степенного закона: немногие пользователи ведут тысячи
+# заметок, у большинства их единицы.
+ACTIVITY_EXPONENT = 1.0
+# Доля длинных заметок вроде логов, которые хранятся сжатыми.
+LONG_NOTES = 0.05
+
+
+def sentence(generator, low, high):
+    words = generator.choices(WORDS, k=generator.randint(low, high))
+    return ' '.join(words).capitalize()
+
+
+def batches(objects, size):
+    objects = iter(objects)
+    while batch := list(itertools.islice(objects, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = 'Создаёт пользователей и заметки для нагрузочного тестирования.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--notes', type=int, default=1_000_000)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Одинаковое зерно даёт одинаковые данные.',
+        )
+
+    def handle(self, *args, **options):
+        self.generator = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.prefix = f'load-{options["seed"]}'
+        user_ids = self.create_users(options['users'])
+        self.create_notes(options['notes'], user_ids)
+
+    def report(self, name, count, started):
+        seconds = time.perf_counter() - started
+        self.stdout.write(
+            f'{name}: {count} за {seconds:.1f} с '
+            f'({count / seconds if seconds else 0:.0f} строк/с)'
+        )
+
+    def insert(self, model, objects, saved=None):
+        """
+        bulk_create пачками, каждая пачка — отдельная транзакция.
+
+        Созданные объекты не копятся: что из них нужно дальше,
+        забирает saved(batch) в той же транзакции, что и вставка.
+        """
+        for batch in batches(objects, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+                if saved is not None:
+                    saved(batch)
+
+    def create_users(self, count):
+        started = time.perf_counter()
+        User = get_user_model()
+        password = make_password(None)
+        user_ids = []
+        self.insert(User, (
+            User(username=f'{self.prefix}-user-{index}', password=password)
+            for index in range(count)
+        ), saved=lambda batch: user_ids.extend(user.pk for user in batch))
+        self.report('Пользователи', count, started)
+        return user_ids
+
+    def text(self):
+        if self.generator.random() >= LONG_NOTES:
+            return sentence(self.generator, 3, 40) + '.'
+        return ''.join(
+            LOG_LINE.format(
+                time=f'{hour:02}:{minute:02}',
+                worker=self.generator.randrange(8),
+                count=self.generator.randrange(1000),
+            )
+            for hour, minute in itertools.islice(
+                itertools.product(range(24), range(60)),
+                self.generator.randint(50, 500),
+            )
+        )
+
+    def create_notes(self, count, user_ids):
+        """
+        Заметки по степенному закону активности пользователей.
+
+        Slug задаётся сразу: bulk_create не вызывает save(), который
+        подбирает его по заголовку. По той же причине заметки
+        добавляются в поисковый индекс отдельно, пачка за пачкой.
+        """
+        if not user_ids:
+            return
+        started = time.perf_counter()
+        active = self.generator.sample(user_ids, len(user_ids))
+        weights = list(itertools.accumulate(
+            rank ** -ACTIVITY_EXPONENT for rank in range(1, len(active) + 1)
+        ))
+        choose_author = functools.partial(
+            self.generator.choices, active, cum_weights=weights,
+        )
+        self.insert(Note, (
+            Note(
+                author_id=choose_author()[0],
+                title=sentence(self.generator, 1, 6)[:100],
+                text=self.text(),
+                slug=f'{self.prefix}-{index}',
+            )
+            for index in range(count)
+        ), saved=index_notes)
+        self.report('Заметки', count, started)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from notes.cache import get_page_stats, reset_page_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания в кеш страниц заметок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true', help='Обнулить счётчики.'
+        )
+
+    def handle(self, *args, **options):
+        stats = get_page_stats()
+        self.stdout.write(
+            f'Попаданий: {stats["hits"]}, промахов: {stats["misses"]}, '
+            f'доля попаданий: {stats["ratio"]:.1%}'
+        )
+        if options['reset']:
+            reset_page_stats()
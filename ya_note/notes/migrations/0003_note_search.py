@@ -0,0 +1,76 @@
+from django.db import migrations
+
+# Полнотекстовый индекс заметок. Внешнее содержимое (content=...)
+# не дублирует текст: FTS5 хранит только индекс и читает заголовок
+# и текст из notes_note. author_id индексируется как обычный токен,
+# поэтому поиск среди заметок одного автора остаётся внутри индекса.
+#
+# При перестройке таблицы notes_note миграцией (AlterField в SQLite)
+# триггеры удаляются вместе со старой таблицей: такую миграцию нужно
+# завершать созданием триггеров заново.
+CREATE_INDEX = (
+    """
+    CREATE VIRTUAL TABLE notes_note_fts USING fts5(
+        title, text, author_id,
+        content='notes_note', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    "INSERT INTO notes_note_fts(notes_note_fts) VALUES ('rebuild')",
+)
+CREATE_TRIGGERS = (
+    """
+    CREATE TRIGGER notes_note_fts_insert AFTER INSERT ON notes_note BEGIN
+        INSERT INTO notes_note_fts(rowid, title, text, author_id)
+        VALUES (new.id, new.title, new.text, new.author_id);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_delete AFTER DELETE ON notes_note BEGIN
+        INSERT INTO notes_note_fts(
+            notes_note_fts, rowid, title, text, author_id
+        )
+        VALUES ('delete', old.id, old.title, old.text, old.author_id);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_update
+    AFTER UPDATE OF title, text, author_id ON notes_note BEGIN
+        INSERT INTO notes_note_fts(
+            notes_note_fts, rowid, title, text, author_id
+        )
+        VALUES ('delete', old.id, old.title, old.text, old.author_id);
+        INSERT INTO notes_note_fts(rowid, title, text, author_id)
+        VALUES (new.id, new.title, new.text, new.author_id);
+    END
+    """,
+)
+DROP_TRIGGERS = (
+    'DROP TRIGGER IF EXISTS notes_note_fts_insert',
+    'DROP TRIGGER IF EXISTS notes_note_fts_delete',
+    'DROP TRIGGER IF EXISTS notes_note_fts_update',
+)
+DROP_INDEX = ('DROP TABLE IF EXISTS notes_note_fts',)
+
+
+def execute(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_note_author_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            execute(CREATE_INDEX + CREATE_TRIGGERS),
+            execute(DROP_TRIGGERS + DROP_INDEX),
+        ),
+    ]
@@ -0,0 +1,129 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:28
+
+from importlib import import_module
+
+import notes.fields
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+search = import_module('notes.migrations.0003_note_search')
+
+# Индекс читает заметки через представление, которое распаковывает
+# текст функцией decompress_text, а триггеры передают в индекс уже
+# распакованный текст. Функция регистрируется только на соединении
+# миграции, с 0006 индекс ведётся из Python.
+CREATE_INDEX = (
+    """
+    CREATE VIEW notes_note_fts_content AS
+    SELECT id, title, decompress_text(text) AS text, author_id
+    FROM notes_note
+    """,
+    """
+    CREATE VIRTUAL TABLE notes_note_fts USING fts5(
+        title, text, author_id,
+        content='notes_note_fts_content', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+)
+CREATE_TRIGGERS = tuple(
+    statement
+    .replace('new.text', 'decompress_text(new.text)')
+    .replace('old.text', 'decompress_text(old.text)')
+    for statement in search.CREATE_TRIGGERS
+)
+REBUILD = ("INSERT INTO notes_note_fts(notes_note_fts) VALUES ('rebuild')",)
+DROP_INDEX = (
+    *search.DROP_TRIGGERS,
+    *search.DROP_INDEX,
+    'DROP VIEW IF EXISTS notes_note_fts_content',
+)
+
+
+def execute(statements):
+    """Выполняет SQL индекса с функцией decompress_text на соединении."""
+    def run(apps, schema_editor):
+        connection = schema_editor.connection
+        if connection.vendor == 'sqlite':
+            connection.connection.create_function(
+                'decompress_text', 1, notes.fields.decompress,
+                deterministic=True,
+            )
+        search.execute(statements)(apps, schema_editor)
+    return run
+
+
+def convert_texts(compress):
+    """
+    Сжимает или распаковывает тексты заметок пачками по BATCH_SIZE.
+
+    Строки читаются курсором по id, в память попадает одна пачка,
+    а переписываются только изменившиеся значения.
+    """
+    def run(apps, schema_editor):
+        Note = apps.get_model('notes', 'Note')
+        field = Note._meta.get_field('text')
+        connection = schema_editor.connection
+        table = connection.ops.quote_name(Note._meta.db_table)
+        last_id = 0
+        with connection.cursor() as cursor:
+            while True:
+                cursor.execute(
+                    f'SELECT id, text FROM {table} WHERE id > %s '
+                    f'ORDER BY id LIMIT %s',
+                    (last_id, BATCH_SIZE),
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                updates = []
+                for pk, stored in rows:
+                    text = notes.fields.decompress(stored)
+                    value = field.get_prep_value(text) if compress else text
+                    if value != stored:
+                        updates.append((value, pk))
+                if updates:
+                    cursor.executemany(
+                        f'UPDATE {table} SET text = %s WHERE id = %s', updates
+                    )
+    return run
+
+
+class Migration(migrations.Migration):
+    """
+    Сжатие текстов заметок.
+
+    AlterField в SQLite пересоздаёт таблицу и теряет триггеры индекса,
+    поэтому индекс удаляется до изменения поля и строится заново после
+    сжатия текстов. Сжатие идёт без триггеров: индекс не переписывается
+    на каждую строку.
+    """
+
+    dependencies = [
+        ('notes', '0003_note_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            search.execute(DROP_INDEX),
+            search.execute(
+                search.CREATE_INDEX + search.CREATE_TRIGGERS
+            ),
+        ),
+        migrations.AlterField(
+            model_name='note',
+            name='text',
+            field=notes.fields.CompressedTextField(
+                compress_above=1024,
+                help_text='Добавьте подробностей',
+                verbose_name='Текст',
+            ),
+        ),
+        migrations.RunPython(convert_texts(True), convert_texts(False)),
+        migrations.RunPython(
+            execute(CREATE_INDEX + CREATE_TRIGGERS + REBUILD),
+            search.execute(DROP_INDEX),
+        ),
+    ]
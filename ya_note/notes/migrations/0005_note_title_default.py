@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Значение по умолчанию и подсказка для заголовка.
+
+    В базе они не хранятся, а AlterField в SQLite пересоздал бы таблицу
+    вместе с триггерами полнотекстового индекса, поэтому меняется только
+    состояние миграций.
+    """
+
+    dependencies = [
+        ('notes', '0004_compress_text'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='note',
+                    name='title',
+                    field=models.CharField(default='Название заметки', help_text='Дайте короткое название заметке', max_length=100, verbose_name='Заголовок'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,73 @@
+from importlib import import_module
+
+import notes.fields
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+compress_text = import_module('notes.migrations.0004_compress_text')
+search = import_module('notes.migrations.0003_note_search')
+
+# Индекс хранит собственную копию заголовка и текста. Триггеры
+# и представление с decompress_text больше не нужны: индекс ведут
+# сигналы Note (см. notes.search), а запись заметок в обход Django
+# не зависит от функций, которых нет вне Python.
+CREATE_INDEX = (
+    """
+    CREATE VIRTUAL TABLE notes_note_fts USING fts5(
+        title, text, author_id,
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+)
+
+
+def fill_index(apps, schema_editor):
+    """Заполняет индекс распакованными текстами пачками по BATCH_SIZE."""
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    last_id = 0
+    with connection.cursor() as cursor:
+        while True:
+            cursor.execute(
+                'SELECT id, title, text, author_id FROM notes_note '
+                'WHERE id > %s ORDER BY id LIMIT %s',
+                (last_id, BATCH_SIZE),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            cursor.executemany(
+                'INSERT INTO notes_note_fts(rowid, title, text, author_id) '
+                'VALUES (%s, %s, %s, %s)',
+                [
+                    (pk, title, notes.fields.decompress(text), author_id)
+                    for pk, title, text, author_id in rows
+                ],
+            )
+
+
+class Migration(migrations.Migration):
+    """Полнотекстовый индекс без триггеров и SQL-функций Python."""
+
+    dependencies = [
+        ('notes', '0005_note_title_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            search.execute(compress_text.DROP_INDEX),
+            compress_text.execute(
+                compress_text.CREATE_INDEX
+                + compress_text.CREATE_TRIGGERS
+                + compress_text.REBUILD
+            ),
+        ),
+        migrations.RunPython(
+            search.execute(CREATE_INDEX),
+            search.execute(search.DROP_INDEX),
+        ),
+        migrations.RunPython(fill_index, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,11 @@
 from django.conf import settings
-from django.db import models
-from pytils.translit import slugify
+from django.db import IntegrityError, models, transaction
+
+from .fields import CompressedTextField
+from .slugs import allocate_slug
+
+# Сколько раз подбираем slug заново, если его успел занять другой запрос.
+SLUG_ATTEMPTS = 5
 
 
 class Note(models.Model):
@@ -10,7 +15,9 @@ class Note(models.Model):
         default='Название заметки',
         help_text='Дайте короткое название заметке'
     )
-    text = models.TextField(
+    # Длинный текст хранится сжатым: искать по нему нужно через
+    # notes.search, условия вроде text__icontains его не находят.
+    text = CompressedTextField(
         'Текст',
         help_text='Добавьте подробностей'
     )
@@ -25,13 +32,34 @@ class Note(models.Model):
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        # Поиск по автору обслуживает составной индекс ниже.
+        db_index=False,
     )
 
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+        )
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """
+        Без заданного slug подбирает свободный по заголовку.
+
+        Между подбором и вставкой другой запрос может занять тот же
+        slug, тогда сработает уникальный индекс. В этом случае
+        подбираем slug заново и повторяем вставку.
+        """
+        if self.slug:
+            return super().save(*args, **kwargs)
+        for attempt in range(SLUG_ATTEMPTS):
+            self.slug = allocate_slug(Note, self.title, exclude_pk=self.pk)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                self.slug = ''
+                if attempt == SLUG_ATTEMPTS - 1:
+                    raise
@@ -0,0 +1,152 @@
+import logging
+import re
+import sys
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.models import Manager
+from django.db.models.fields.related_descriptors import (
+    ForwardManyToOneDescriptor
+)
+
+from .slow_queries import find_origin
+
+logger = logging.getLogger('notes.nplusone')
+
+# Сколько раз выполнялся каждый вид SELECT в текущем запросе.
+current_counts = ContextVar('notes_nplusone_counts', default=None)
+
+# Списки параметров разной длины в IN (...) — один и тот же запрос.
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+class NPlusOneError(Exception):
+    """Один и тот же запрос выполняется для каждой строки."""
+
+
+def get_fingerprint(sql):
+    return IN_LIST.sub('IN (...)', sql)
+
+
+def find_attribute():
+    """
+    Связь модели, через которую пришёл запрос.
+
+    Возвращает ``Note.author`` для обращения к внешнему ключу
+    и ``User.note_set`` для обратного менеджера.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        owner = frame.f_locals.get('self')
+        if isinstance(owner, ForwardManyToOneDescriptor):
+            return f'{owner.field.model.__name__}.{owner.field.name}'
+        if isinstance(owner, Manager) and hasattr(owner, 'instance'):
+            return f'{type(owner.instance).__name__}.{get_accessor(owner)}'
+        frame = frame.f_back
+    return None
+
+
+def get_accessor(manager):
+    """
+    Имя атрибута связанного менеджера.
+
+    У обратного менеджера внешнего ключа есть field, у менеджера
+    многие-ко-многим его нет: прямая связь называется по полю,
+    обратная — по related_name поля на другой модели.
+    """
+    field = getattr(manager, 'field', None)
+    if field is not None:
+        return field.remote_field.get_accessor_name()
+    if getattr(manager, 'reverse', False):
+        field = manager.model._meta.get_field(manager.query_field_name)
+        return field.remote_field.get_accessor_name()
+    return manager.prefetch_cache_name
+
+
+def count_query(execute, sql, params, many, context):
+    """
+    Обёртка execute, её вызывает instrumentation.observe_query.
+
+    Считает SELECT только внутри запроса, который отслеживает
+    NPlusOneMiddleware, остальные сразу передаёт дальше.
+    """
+    counts = current_counts.get()
+    if counts is not None and sql.startswith('SELECT'):
+        fingerprint = get_fingerprint(sql)
+        counts[fingerprint] += 1
+        if counts[fingerprint] == settings.NOTES_NPLUSONE_MAX_REPEATS + 1:
+            report_repeats(sql)
+    return execute(sql, params, many, context)
+
+
+def report_repeats(sql):
+    """
+    Сообщает о запросе N+1.
+
+    Ошибка при поиске источника не должна ломать сам запрос к базе,
+    поэтому тогда сообщение уходит без источника.
+    """
+    try:
+        template, code = find_origin()
+        attribute = find_attribute()
+    except Exception:
+        logger.exception('Не удалось найти источник запроса N+1')
+        template = code = attribute = None
+    message = (
+        f'Запрос повторяется больше '
+        f'{settings.NOTES_NPLUSONE_MAX_REPEATS} раз: '
+        f'{attribute or "-"} в {template or code or "-"}: {sql}'
+    )
+    if settings.NOTES_NPLUSONE_RAISE:
+        raise NPlusOneError(message)
+    logger.warning(
+        message,
+        extra={
+            'sql': sql, 'attribute': attribute,
+            'template': template, 'code': code,
+        },
+    )
+
+
+class NPlusOneMiddleware:
+    """
+    Находит запросы N+1: одинаковые SELECT внутри одного запроса.
+
+    Если запрос с точностью до параметров выполняется больше
+    NOTES_NPLUSONE_MAX_REPEATS раз, в журнал notes.nplusone пишется
+    связь модели и строка шаблона или кода, откуда он пришёл, а при
+    NOTES_NPLUSONE_RAISE выбрасывается NPlusOneError. Если порог None,
+    middleware ничего не делает.
+
+    Запросы к базе считает count_query в том потоке, где они
+    выполняются, а счётчики доходят до него через current_counts.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if settings.NOTES_NPLUSONE_MAX_REPEATS is None:
+            return self.get_response(request)
+        token = current_counts.set(Counter())
+        try:
+            return self.get_response(request)
+        finally:
+            current_counts.reset(token)
+
+    async def __acall__(self, request):
+        if settings.NOTES_NPLUSONE_MAX_REPEATS is None:
+            return await self.get_response(request)
+        token = current_counts.set(Counter())
+        try:
+            return await self.get_response(request)
+        finally:
+            current_counts.reset(token)
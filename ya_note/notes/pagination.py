@@ -0,0 +1,65 @@
+from django.http import Http404
+
+
+class KeysetPaginator:
+    """
+    Постраничный вывод по id вместо OFFSET.
+
+    Курсор — id последнего объекта страницы, поэтому следующая
+    страница начинается с поиска по индексу (author, id), а не
+    с пропуска всех предыдущих строк.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset.order_by('id')
+        self.per_page = per_page
+
+    def get_page(self, cursor=None):
+        """
+        Возвращает страницу после курсора.
+
+        Неправильный курсор приводит к 404, как и несуществующий номер
+        страницы у стандартного пагинатора.
+        """
+        queryset = self.queryset
+        if cursor:
+            queryset = queryset.filter(id__gt=self.decode_cursor(cursor))
+        return KeysetPage(self, queryset[:self.per_page])
+
+    def encode_cursor(self, obj):
+        return str(obj.id)
+
+    def decode_cursor(self, cursor):
+        try:
+            return int(cursor)
+        except ValueError:
+            raise Http404('Неправильный курсор страницы.')
+
+
+class KeysetPage:
+    """
+    Страница keyset-пагинатора.
+
+    Ссылка на следующую страницу показывается, если текущая заполнена
+    целиком: так на страницу уходит ровно один запрос.
+    """
+
+    def __init__(self, paginator, object_list):
+        self.paginator = paginator
+        self.object_list = object_list
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return len(self.object_list) == self.paginator.per_page
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        last = self.object_list[len(self.object_list) - 1]
+        return self.paginator.encode_cursor(last)
@@ -1,9 +1,29 @@
 import pytest
+from django.core.cache import cache
 from django.test.client import Client
 
+from notes import slow_queries
 from notes.models import Note
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def detect_n_plus_one(settings):
+    """Запрос N+1 в любом представлении роняет тест."""
+    settings.NOTES_NPLUSONE_MAX_REPEATS = 3
+    settings.NOTES_NPLUSONE_RAISE = True
+
+
+@pytest.fixture(autouse=True)
+def disable_slow_query_log(settings):
+    """Журнал медленных запросов включает только фикстура slow_query_log."""
+    settings.NOTES_SLOW_QUERY_MS = None
+
+
 @pytest.fixture
 def author(django_user_model):
     return django_user_model.objects.create(username='Автор')
@@ -51,3 +71,23 @@ def form_data():
         'text': 'Новый текст',
         'slug': 'new-slug'
     }
+
+
+@pytest.fixture
+def server_timing(settings):
+    """Замеры времени для каждого запроса."""
+    middleware = 'notes.timing.ServerTimingMiddleware'
+    if middleware not in settings.MIDDLEWARE:
+        settings.MIDDLEWARE = [middleware, *settings.MIDDLEWARE]
+    settings.NOTES_TIMING_SAMPLE_RATE = 1.0
+
+
+@pytest.fixture
+def slow_query_log(settings, monkeypatch):
+    """Каждый запрос к базе считается медленным, журнал — в caplog."""
+    settings.NOTES_SLOW_QUERY_MS = 0
+    monkeypatch.setattr(slow_queries.logger, 'handlers', [])
+    monkeypatch.setattr(slow_queries.logger, 'propagate', True)
+    slow_queries.reset_slow_queries()
+    yield
+    slow_queries.reset_slow_queries()
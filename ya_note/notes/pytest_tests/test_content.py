@@ -1,8 +1,23 @@
+import logging
+import re
+import zlib
+from http import HTTPStatus
+from io import StringIO
+
 import pytest
 import pytest_lazyfixture
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.middleware.csrf import _unmask_cipher_token
+from django.test.client import Client
 from django.urls import reverse
 
+from notes.cache import get_page_stats, reset_page_stats
 from notes.forms import NoteForm
+from notes.models import Note
+from notes.slow_queries import get_slow_queries
 
 
 @pytest.mark.parametrize(
@@ -33,3 +48,303 @@ def test_pages_contains_form(author_client, name, args):
     response = author_client.get(url)
     assert 'form' in response.context
     assert isinstance(response.context['form'], NoteForm)
+
+
+def test_notes_list_is_paginated(author, author_client, settings):
+    # Arrange
+    settings.NOTES_COUNT_ON_LIST_PAGE = 3
+    notes = Note.objects.bulk_create(
+        Note(title='Заголовок', text='Текст', slug=f'slug-{index}',
+             author=author)
+        for index in range(7)
+    )
+    url = reverse('notes:list')
+    seen = []
+    params = {}
+
+    # Act
+    while params is not None:
+        response = author_client.get(url, params)
+        page = response.context['page_obj']
+        seen.extend(response.context['object_list'])
+        params = {'after': page.next_cursor} if page.has_next() else None
+
+    # Assert
+    assert [note.pk for note in seen] == [note.pk for note in notes]
+    assert all('text' in note.get_deferred_fields() for note in seen)
+
+
+def test_notes_list_rejects_broken_cursor(author_client):
+    # Arrange
+    url = reverse('notes:list')
+
+    # Act
+    response = author_client.get(url, {'after': 'abc'})
+
+    # Assert
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_search_finds_only_own_notes(note, author_client, not_author):
+    # Arrange
+    Note.objects.create(
+        title='Чужая', text='Текст заметки', slug='other', author=not_author
+    )
+    url = reverse('notes:search')
+
+    # Act
+    response = author_client.get(url, {'q': 'текст'})
+
+    # Assert
+    assert [found.pk for found in response.context['object_list']] == [
+        note.pk
+    ]
+
+
+def test_search_ignores_author_id(note, author, author_client):
+    # Arrange
+    url = reverse('notes:search')
+
+    # Act
+    response = author_client.get(url, {'q': str(author.pk)})
+
+    # Assert
+    assert response.context['object_list'] == []
+
+
+def test_search_highlights_and_escapes_matches(author, author_client):
+    # Arrange
+    Note.objects.create(
+        title='<b>Список</b>', text='Купить <script>молоко</script>',
+        slug='list', author=author,
+    )
+    url = reverse('notes:search')
+
+    # Act
+    response = author_client.get(url, {'q': 'молок'})
+
+    # Assert
+    found = response.context['object_list'][0]
+    assert found.title_match == '&lt;b&gt;Список&lt;/b&gt;'
+    assert found.text_match == (
+        'Купить &lt;script&gt;<mark>молоко</mark>&lt;/script&gt;'
+    )
+
+
+def test_search_ranks_title_matches_first(author, author_client):
+    # Arrange
+    Note.objects.create(
+        title='Разное', text='Про отпуск и не только', slug='misc',
+        author=author,
+    )
+    vacation = Note.objects.create(
+        title='Отпуск', text='Отпуск в горах, отпуск у моря',
+        slug='vacation', author=author,
+    )
+    url = reverse('notes:search')
+
+    # Act
+    response = author_client.get(url, {'q': 'отпуск'})
+
+    # Assert
+    assert response.context['object_list'][0].pk == vacation.pk
+
+
+def test_search_finds_compressed_notes(author, author_client):
+    # Arrange
+    note = Note.objects.create(
+        title='Лог', text='ошибка соединения ' * 200, author=author
+    )
+    url = reverse('notes:search')
+
+    # Act
+    response = author_client.get(url, {'q': 'соединени'})
+
+    # Assert
+    found = response.context['object_list']
+    assert [result.pk for result in found] == [note.pk]
+    assert '<mark>соединения</mark>' in found[0].text_match
+
+
+def test_search_index_follows_changes(note, author_client):
+    # Arrange
+    url = reverse('notes:search')
+
+    # Act
+    note.text = 'Обновлённый черновик'
+    note.save()
+    after_update = author_client.get(url, {'q': 'черновик'})
+    old_text = author_client.get(url, {'q': 'текст'})
+    note.delete()
+    after_delete = author_client.get(url, {'q': 'черновик'})
+
+    # Assert
+    assert len(after_update.context['object_list']) == 1
+    assert old_text.context['object_list'] == []
+    assert after_delete.context['object_list'] == []
+
+
+def test_rebuild_indexes_notes_written_outside_django(author, author_client):
+    # Arrange
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO notes_note (title, text, slug, author_id) '
+            'VALUES (%s, %s, %s, %s)',
+            ('Лог', zlib.compress('ошибка соединения'.encode()), 'log',
+             author.pk),
+        )
+    url = reverse('notes:search')
+    before = author_client.get(url, {'q': 'соединения'})
+
+    # Act
+    call_command('rebuild_search_index', stdout=StringIO())
+
+    # Assert
+    after = author_client.get(url, {'q': 'соединения'})
+    assert before.context['object_list'] == []
+    assert [note.slug for note in after.context['object_list']] == ['log']
+
+
+@pytest.mark.parametrize('query', ('', '"', 'NEAR(', '*', 'AND OR'))
+def test_search_tolerates_query_syntax(note, author_client, query):
+    url = reverse('notes:search')
+    response = author_client.get(url, {'q': query})
+    assert response.status_code == 200
+
+
+def test_note_pages_are_cached_per_user(
+    note, author_client, django_assert_num_queries
+):
+    # Arrange
+    url = reverse('notes:detail', args=(note.slug,))
+    author_client.get(url)
+    author_client.get(url)
+    reset_page_stats()
+
+    # Act
+    with django_assert_num_queries(2):
+        response = author_client.get(url)
+
+    # Assert
+    assert note.title in response.content.decode()
+    assert get_page_stats() == {'hits': 1, 'misses': 0, 'ratio': 1.0}
+
+
+@pytest.mark.parametrize('name', ('notes:detail', 'notes:list'))
+def test_cached_pages_show_own_writes(
+    note, author_client, name, django_capture_on_commit_callbacks
+):
+    # Arrange
+    args = (note.slug,) if name == 'notes:detail' else None
+    url = reverse(name, args=args)
+    author_client.get(url)
+    author_client.get(url)
+    edit_url = reverse('notes:edit', args=(note.slug,))
+
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        author_client.post(edit_url, data={
+            'title': 'Новый заголовок', 'text': 'Текст', 'slug': note.slug
+        })
+    response = author_client.get(url)
+
+    # Assert
+    assert 'Новый заголовок' in response.content.decode()
+
+
+def test_cached_page_keeps_csrf_token_of_each_browser(note, author):
+    # Arrange
+    url = reverse('notes:detail', args=(note.slug,))
+    browsers = [Client(), Client()]
+    for browser in browsers:
+        browser.force_login(author)
+        browser.get(url)
+        browser.get(url)
+
+    # Act
+    responses = [browser.get(url) for browser in browsers]
+
+    # Assert
+    for browser, response in zip(browsers, responses):
+        token = re.search(
+            r'name="csrfmiddlewaretoken" value="([^"]+)"',
+            response.content.decode(),
+        ).group(1)
+        assert _unmask_cipher_token(token) == (
+            browser.cookies[settings.CSRF_COOKIE_NAME].value
+        )
+
+
+def test_server_timing_header(server_timing, note, author_client, caplog):
+    # Arrange
+    url = reverse('notes:detail', args=(note.slug,))
+    author_client.get(url)
+    caplog.clear()
+
+    # Act
+    with caplog.at_level(logging.INFO, logger='notes.timing'):
+        missed = author_client.get(url)
+        cached = author_client.get(url)
+
+    # Assert
+    header = missed['Server-Timing']
+    assert re.search(r'db;dur=[\d.]+;desc="[1-9]\d* SQL"', header)
+    assert re.search(r'tpl;dur=[\d.]*[1-9]', header)
+    assert 'cache;desc="hit=0 miss=1"' in header
+    assert 'cache;desc="hit=1 miss=0"' in cached['Server-Timing']
+    assert [record.route for record in caplog.records] == [
+        'notes:detail', 'notes:detail'
+    ]
+
+
+def test_server_timing_header_under_asgi(
+    server_timing, note, author, async_client
+):
+    # Arrange
+    async_client.force_login(author)
+    url = reverse('notes:detail', args=(note.slug,))
+
+    # Act
+    response = async_to_sync(async_client.get)(url)
+
+    # Assert
+    header = response['Server-Timing']
+    assert re.search(r'db;dur=[\d.]+;desc="[1-9]\d* SQL"', header)
+    assert re.search(r'tpl;dur=[\d.]*[1-9]', header)
+
+
+def test_slow_query_points_to_code_line(
+    slow_query_log, note, author_client, caplog
+):
+    # Act
+    with caplog.at_level(logging.WARNING, logger='notes.slow_queries'):
+        author_client.get(reverse('notes:list'))
+
+    # Assert
+    [notes_query] = [
+        query for query in get_slow_queries()['notes:list']
+        if 'FROM "notes_note"' in query['sql']
+    ]
+    assert notes_query['template'] is None
+    assert re.fullmatch(
+        r'notes/pagination\.py:\d+ in has_next', notes_query['code']
+    )
+    assert notes_query['params'] == repr((note.author_id,))
+    assert {record.view for record in caplog.records} == {'notes:list'}
+
+
+def test_slow_query_under_asgi(slow_query_log, note, author, async_client):
+    # Arrange
+    async_client.force_login(author)
+
+    # Act
+    async_to_sync(async_client.get)(reverse('notes:list'))
+
+    # Assert
+    [notes_query] = [
+        query for query in get_slow_queries()['notes:list']
+        if 'FROM "notes_note"' in query['sql']
+    ]
+    assert re.fullmatch(
+        r'notes/pagination\.py:\d+ in has_next', notes_query['code']
+    )
@@ -1,12 +1,20 @@
+import json
 from http import HTTPStatus
+from io import StringIO
 
 import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.urls import reverse
 from pytest_django.asserts import assertFormError, assertRedirects
 from pytils.translit import slugify
 
 from notes.forms import WARNING
 from notes.models import Note
+from notes.search import search_notes
+from notes.slugs import allocate_slugs
 
 
 def test_user_can_create_note(author_client, author, form_data):
@@ -86,3 +94,245 @@ def test_other_user_cant_delete_note(not_author_client, slug_for_args):
     response = not_author_client.post(url)
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert Note.objects.count() == 1
+
+
+def test_empty_slug_gets_free_suffix(author_client, author, form_data):
+    # Arrange
+    url = reverse('notes:add')
+    form_data.pop('slug')
+    expected_slug = slugify(form_data['title'])
+
+    # Act
+    for _ in range(3):
+        response = author_client.post(url, data=form_data)
+
+    # Assert
+    assertRedirects(response, reverse('notes:success'))
+    slugs = set(Note.objects.values_list('slug', flat=True))
+    assert slugs == {
+        expected_slug, f'{expected_slug}-2', f'{expected_slug}-3'
+    }
+
+
+@pytest.mark.django_db
+def test_long_title_slug_fits_with_suffix(author):
+    # Arrange
+    title = 'Заголовок' * 20
+    max_length = Note._meta.get_field('slug').max_length
+
+    # Act
+    notes = [
+        Note.objects.create(title=title, text='Текст', author=author)
+        for _ in range(2)
+    ]
+
+    # Assert
+    assert len(notes[0].slug) == max_length
+    assert notes[1].slug.endswith('-2')
+    assert len(notes[1].slug) <= max_length
+
+
+@pytest.mark.django_db
+def test_slug_suffix_skips_non_numeric_neighbours(author):
+    # Arrange
+    Note.objects.bulk_create(
+        Note(title='Покупки', text='Текст', slug=slug, author=author)
+        for slug in ('pokupki', 'pokupki-7-spisok', 'pokupki-9a')
+    )
+
+    # Act
+    note = Note.objects.create(title='Покупки', text='Текст', author=author)
+    # Без подсказки в кеше номер для пачки ищется запросом по диапазону.
+    cache.clear()
+    batch = allocate_slugs(Note, [('Покупки', '')])
+
+    # Assert
+    assert note.slug == 'pokupki-2'
+    assert batch == ['pokupki-3']
+
+
+@pytest.mark.django_db
+def test_slug_taken_concurrently_is_allocated_again(
+    author, note, monkeypatch
+):
+    # Arrange
+    slugs = iter((note.slug, 'free-slug'))
+    monkeypatch.setattr(
+        'notes.models.allocate_slug', lambda *args, **kwargs: next(slugs)
+    )
+
+    # Act
+    new_note = Note.objects.create(title='Текст', text='Текст', author=author)
+
+    # Assert
+    assert new_note.slug == 'free-slug'
+    assert Note.objects.count() == 2
+
+
+def test_user_can_import_notes(author_client, author, note):
+    # Arrange
+    lines = [
+        {'title': 'Покупки', 'text': 'Молоко'},
+        {'title': 'Покупки', 'text': 'Хлеб'},
+        {'title': 'Своя', 'text': 'Текст', 'slug': 'own-slug'},
+        {'title': 'Занятый', 'text': 'Текст', 'slug': note.slug},
+    ]
+    upload = SimpleUploadedFile('notes.jsonl', '\n'.join(
+        json.dumps(line, ensure_ascii=False) for line in lines
+    ).encode())
+    url = reverse('notes:import')
+
+    # Act
+    response = author_client.post(
+        url, data={'file': upload, 'format': 'jsonl'}
+    )
+
+    # Assert
+    assertRedirects(response, reverse('notes:success'))
+    imported = Note.objects.exclude(pk=note.pk).order_by('id')
+    assert [(new.text, new.slug) for new in imported] == [
+        ('Молоко', 'pokupki'),
+        ('Хлеб', 'pokupki-2'),
+        ('Текст', 'own-slug'),
+        ('Текст', f'{note.slug}-2'),
+    ]
+    assert all(new.author == author for new in imported)
+    found = search_notes(author, 'молоко', settings.NOTES_SEARCH_RESULTS)
+    assert [result.slug for result in found] == ['pokupki']
+
+
+def test_import_with_invalid_line_saves_nothing(author_client):
+    # Arrange
+    upload = SimpleUploadedFile(
+        'notes.csv', 'title,text\nЗаголовок,Текст\nБез текста,\n'.encode()
+    )
+    url = reverse('notes:import')
+
+    # Act
+    response = author_client.post(url, data={'file': upload, 'format': 'csv'})
+
+    # Assert
+    assert response.status_code == HTTPStatus.OK
+    assert 'Строка 3' in response.context['form'].errors['file'][0]
+    assert Note.objects.count() == 0
+
+
+@pytest.mark.parametrize('file_format', ('jsonl', 'csv'))
+def test_export_can_be_imported_back(
+    author_client, author, not_author_client, file_format
+):
+    # Arrange
+    Note.objects.create(
+        title='Заголовок', text='Текст,\n"в кавычках"', slug='first',
+        author=author,
+    )
+    Note.objects.create(title='Второй', text='Текст', author=author)
+    Note.objects.create(
+        title='Лог', text='Длинная строка лога\n' * 100, author=author
+    )
+    export_url = reverse('notes:export', args=(file_format,))
+    response = author_client.get(export_url)
+    exported = b''.join(response.streaming_content)
+
+    # Act
+    not_author_client.post(reverse('notes:import'), data={
+        'file': SimpleUploadedFile(f'notes.{file_format}', exported),
+        'format': file_format,
+    })
+
+    # Assert
+    copies = Note.objects.exclude(author=author).order_by('id')
+    assert [(copy.title, copy.text, copy.slug) for copy in copies] == [
+        ('Заголовок', 'Текст,\n"в кавычках"', 'first-2'),
+        ('Второй', 'Текст', 'vtoroj-2'),
+        ('Лог', 'Длинная строка лога\n' * 100, 'log-2'),
+    ]
+
+
+@pytest.mark.django_db
+def test_long_note_text_is_stored_compressed(author):
+    # Arrange
+    text = 'Длинная строка лога\n' * 100
+
+    # Act
+    note = Note.objects.create(title='Лог', text=text, author=author)
+
+    # Assert
+    stored = Note.objects.filter(pk=note.pk).values_list('text', flat=True)
+    assert isinstance(stored[0], bytes)
+    assert Note.objects.get(pk=note.pk).text == text
+
+
+@pytest.mark.django_db
+def test_note_list_does_not_unpack_text(author, author_client):
+    # Arrange
+    Note.objects.create(
+        title='Лог', text='Длинная строка лога\n' * 100, author=author
+    )
+
+    # Act
+    response = author_client.get(reverse('notes:list'))
+
+    # Assert
+    assert all(
+        'text' not in note.__dict__ for note in response.context['object_list']
+    )
+
+
+def test_note_burst_is_throttled(author_client, settings, monkeypatch):
+    # Arrange
+    settings.NOTES_THROTTLE_RATES = {'note': {'user': '2/min'}}
+    now = 1_000_000.0
+    monkeypatch.setattr('notes.throttling.time.time', lambda: now)
+    url = reverse('notes:add')
+
+    # Act
+    burst = [
+        author_client.post(url, data={'title': f'Заметка {i}', 'text': 'Т'})
+        for i in range(4)
+    ]
+    now += 30
+    after_wait = author_client.post(url, data={'title': 'Ещё', 'text': 'Т'})
+
+    # Assert
+    assert [response.status_code for response in burst] == [
+        HTTPStatus.FOUND, HTTPStatus.FOUND,
+        HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.TOO_MANY_REQUESTS,
+    ]
+    assert burst[-1]['Retry-After'] == '30'
+    assert after_wait.status_code == HTTPStatus.FOUND
+    assert Note.objects.count() == 3
+
+
+def test_note_throttle_does_not_limit_reading(author_client, settings, note):
+    # Arrange
+    settings.NOTES_THROTTLE_RATES = {'note': {'user': '1/min', 'ip': '1/min'}}
+    url = reverse('notes:add')
+
+    # Act
+    responses = [author_client.get(url) for _ in range(3)]
+
+    # Assert
+    assert all(response.status_code == HTTPStatus.OK for response in responses)
+
+
+@pytest.mark.django_db
+def test_generate_data_is_deterministic(django_user_model):
+    # Arrange
+    options = {
+        'users': 5, 'notes': 200, 'batch_size': 30, 'seed': 1,
+        'stdout': StringIO(),
+    }
+    call_command('generate_data', **options)
+    first = list(Note.objects.values_list('title', 'text', 'author__username'))
+    django_user_model.objects.all().delete()
+
+    # Act
+    call_command('generate_data', **options)
+
+    # Assert
+    second = list(
+        Note.objects.values_list('title', 'text', 'author__username')
+    )
+    assert second == first
+    assert len(second) == 200
@@ -0,0 +1,125 @@
+import pytest
+import pytest_lazyfixture
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.urls import path, reverse
+
+from notes.models import Note
+from notes.nplusone import NPlusOneError
+
+pytestmark = pytest.mark.django_db
+
+ANONYMOUS = pytest_lazyfixture.lazy_fixture('client')
+AUTHOR = pytest_lazyfixture.lazy_fixture('author_client')
+FORM_DATA = {'title': 'Заголовок', 'text': 'Текст', 'slug': 'new-slug'}
+
+
+def note_authors(request):
+    """Автор каждой заметки — отдельным запросом."""
+    return HttpResponse(', '.join(
+        note.author.username for note in Note.objects.all()
+    ))
+
+
+def group_counts(request):
+    """Число групп каждого пользователя — отдельным запросом."""
+    return HttpResponse(', '.join(
+        str(user.groups.count()) for user in get_user_model().objects.all()
+    ))
+
+
+# Представления с запросами N+1 для проверки детектора.
+urlpatterns = [
+    path('authors/', note_authors),
+    path('groups/', group_counts),
+]
+
+
+@pytest.mark.parametrize(
+    'parametrized_client, method, name, with_slug, data, queries',
+    (
+        (ANONYMOUS, 'get', 'notes:home', False, None, 0),
+        # Дальше к каждому запросу добавляются сессия и пользователь.
+        (AUTHOR, 'get', 'notes:list', False, None, 3),
+        (AUTHOR, 'get', 'notes:detail', True, None, 3),
+        (AUTHOR, 'get', 'notes:add', False, None, 2),
+        # Вставка заметки в точке сохранения (SAVEPOINT и RELEASE)
+        # и запись в поисковый индекс.
+        (AUTHOR, 'post', 'notes:add', False, FORM_DATA, 6),
+        (AUTHOR, 'get', 'notes:edit', True, None, 3),
+        # Заметка, обновление в точке сохранения и замена в индексе.
+        (AUTHOR, 'post', 'notes:edit', True, FORM_DATA, 8),
+        (AUTHOR, 'get', 'notes:delete', True, None, 3),
+        # Заметка, удаление и удаление из индекса.
+        (AUTHOR, 'post', 'notes:delete', True, None, 5),
+        (AUTHOR, 'get', 'notes:success', False, None, 2),
+        # Поиск по индексу вместе с чтением заметок.
+        (AUTHOR, 'get', 'notes:search', False, {'q': 'текст'}, 3),
+    ),
+)
+def test_query_count(
+    parametrized_client, method, name, with_slug, data, queries,
+    slug_for_args, django_assert_num_queries
+):
+    # Arrange
+    url = reverse(name, args=slug_for_args if with_slug else None)
+
+    # Act
+    with django_assert_num_queries(queries):
+        response = getattr(parametrized_client, method)(url, data=data)
+
+    # Assert
+    assert response.status_code < 400
+
+
+@pytest.mark.urls(__name__)
+def test_n_plus_one_points_to_attribute(author, client):
+    # Arrange
+    Note.objects.bulk_create(
+        Note(title='Заметка', text='Текст', slug=f'note-{index}',
+             author=author)
+        for index in range(4)
+    )
+
+    # Act
+    with pytest.raises(NPlusOneError) as error:
+        client.get('/authors/')
+
+    # Assert
+    message = str(error.value)
+    assert 'Note.author' in message
+    assert 'test_queries.py' in message
+
+
+@pytest.mark.urls(__name__)
+def test_n_plus_one_under_asgi(author, async_client):
+    # Arrange
+    Note.objects.bulk_create(
+        Note(title='Заметка', text='Текст', slug=f'note-{index}',
+             author=author)
+        for index in range(4)
+    )
+
+    # Act
+    with pytest.raises(NPlusOneError) as error:
+        async_to_sync(async_client.get)('/authors/')
+
+    # Assert
+    assert 'Note.author' in str(error.value)
+
+
+@pytest.mark.urls(__name__)
+def test_n_plus_one_through_many_to_many(django_user_model, client):
+    # Arrange
+    django_user_model.objects.bulk_create(
+        django_user_model(username=f'Пользователь {index}')
+        for index in range(4)
+    )
+
+    # Act
+    with pytest.raises(NPlusOneError) as error:
+        client.get('/groups/')
+
+    # Assert
+    assert 'User.groups' in str(error.value)
@@ -29,7 +29,10 @@ def test_pages_availability_for_anonymous_user(client, name):
 
 @pytest.mark.parametrize(
     'name',
-    ('notes:list', 'notes:add', 'notes:success')
+    (
+        'notes:list', 'notes:add', 'notes:success', 'notes:search',
+        'notes:import',
+    )
 )
 def test_pages_availability_for_auth_user(not_author_client, name):
     url = reverse(name)
@@ -68,6 +71,8 @@ def test_pages_availability_for_different_users(
         ('notes:add', None),
         ('notes:success', None),
         ('notes:list', None),
+        ('notes:search', None),
+        ('notes:import', None),
     ),
 )
 def test_redirects(client, name, args):
@@ -0,0 +1,126 @@
+import re
+
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Note
+
+# Служебные символы вокруг найденных слов: их не бывает в тексте,
+# поэтому после экранирования их можно заменить на <mark>.
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+SNIPPET_TOKENS = 16
+# Столько заметок читается за раз при перестройке индекса.
+REBUILD_BATCH_SIZE = 1000
+
+SEARCH_SQL = f"""
+    SELECT
+        notes_note.id, notes_note.title, notes_note.slug,
+        highlight(notes_note_fts, 0, %s, %s) AS title_match,
+        snippet(notes_note_fts, 1, %s, %s, '…', {SNIPPET_TOKENS})
+            AS text_match
+    FROM notes_note_fts
+    JOIN notes_note ON notes_note.id = notes_note_fts.rowid
+    WHERE notes_note_fts MATCH %s
+    ORDER BY notes_note_fts.rank
+    LIMIT %s
+"""
+
+
+def build_match(author, query):
+    """
+    Выражение FTS5 из запроса пользователя.
+
+    Каждое слово берётся в кавычки, поэтому синтаксис FTS5 в запросе
+    ничего не значит, и ищется как префикс: «заметк» найдёт «заметки».
+    Автор — обязательное условие на колонку author_id, а слова ищутся
+    только в заголовке и тексте: иначе запрос «7» нашёл бы все заметки
+    автора с id 7.
+    """
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    terms = ' '.join(f'"{word}"*' for word in words)
+    return f'author_id:"{author.pk}" AND {{title text}}: ({terms})'
+
+
+def highlight(value):
+    return mark_safe(
+        escape(value)
+        .replace(MATCH_START, '<mark>')
+        .replace(MATCH_END, '</mark>')
+    )
+
+
+def search_notes(author, query, limit):
+    """
+    Заметки автора, подходящие под запрос, от самых релевантных.
+
+    У каждой заметки есть title_match и text_match: заголовок
+    и фрагмент текста с подсвеченными совпадениями.
+    """
+    match = build_match(author, query)
+    if match is None or connection.vendor != 'sqlite':
+        return []
+    markers = (MATCH_START, MATCH_END)
+    notes = list(Note.objects.raw(
+        SEARCH_SQL, (*markers, *markers, match, limit)
+    ))
+    for note in notes:
+        note.title_match = highlight(note.title_match)
+        note.text_match = highlight(note.text_match)
+    return notes
+
+
+def index_notes(notes):
+    """
+    Добавляет заметки в индекс.
+
+    Индекс ведётся из Python, а не триггерами: триггерам пришлось бы
+    распаковывать текст функцией, которой нет вне Django, и запись
+    заметок из sqlite3 или другого процесса падала бы. Запись в обход
+    Django в индекс не попадает, после неё нужна команда
+    rebuild_search_index.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO notes_note_fts(rowid, title, text, author_id) '
+            'VALUES (%s, %s, %s, %s)',
+            [
+                (note.pk, note.title, note.text, note.author_id)
+                for note in notes
+            ],
+        )
+
+
+def unindex_note(pk):
+    """Убирает заметку из индекса, если она там есть."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM notes_note_fts WHERE rowid = %s', (pk,))
+
+
+def rebuild_index(batch_size=REBUILD_BATCH_SIZE):
+    """
+    Заново строит индекс по всем заметкам.
+
+    Заметки читаются пачками по id, поэтому в памяти одновременно
+    только batch_size распакованных текстов.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM notes_note_fts')
+    notes = Note.objects.only(
+        'id', 'title', 'text', 'author_id'
+    ).order_by('id')
+    last_id = 0
+    while batch := list(notes.filter(id__gt=last_id)[:batch_size]):
+        index_notes(batch)
+        last_id = batch[-1].pk
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO notes_note_fts(notes_note_fts) VALUES ('optimize')"
+        )
@@ -0,0 +1,53 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import search
+from .cache import bump_user_version
+from .instrumentation import observe_query
+from .models import Note
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def invalidate_pages(instance, **kwargs):
+    """
+    Новая версия заметок автора после любой записи.
+
+    Версию меняем после фиксации транзакции, как и в новостях:
+    иначе параллельный запрос закешировал бы старую страницу
+    под новой версией.
+    """
+    author_id = instance.author_id
+    transaction.on_commit(lambda: bump_user_version(author_id))
+
+
+@receiver(post_save, sender=Note)
+def index_note(instance, created, **kwargs):
+    """Изменённая заметка заменяет в индексе прежнюю версию."""
+    if not created:
+        search.unindex_note(instance.pk)
+    search.index_notes([instance])
+
+
+@receiver(post_delete, sender=Note)
+def unindex_note(instance, **kwargs):
+    search.unindex_note(instance.pk)
+
+
+@receiver(connection_created)
+def install_execute_wrapper(connection, **kwargs):
+    """
+    Обёртка замеров на каждом соединении с базой.
+
+    У каждого потока своё соединение, а под ASGI представления ходят
+    в базу не из того потока, где работает middleware, поэтому
+    обёртка ставится здесь, а middleware только включают замеры через
+    ContextVar. Список обёрток соединения переживает переподключение,
+    поэтому повторно она не добавляется. Ставится она в начало списка:
+    connection.execute_wrapper() снимает последнюю обёртку, и соединение,
+    открытое внутри такого блока, не должно её подменить.
+    """
+    if observe_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, observe_query)
@@ -0,0 +1,179 @@
+import re
+from collections import Counter
+from functools import lru_cache, reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, Max, Q
+from django.db.models.functions import Cast, Substr
+from pytils.translit import slugify
+
+# Место под суффикс вида «-999999» у длинных slug.
+SUFFIX_LENGTH = 7
+DEFAULT_SLUG = 'note'
+LAST_NUMBER_KEY = 'notes:slug-number:{prefix}'
+LAST_NUMBER_TIMEOUT = 60 * 60 * 24
+# Столько префиксов проверяется одним запросом при подборе slug пачкой.
+PREFIXES_PER_QUERY = 100
+
+
+@lru_cache(maxsize=4096)
+def transliterate(title):
+    """Транслитерация заголовка: одинаковые заголовки не пересчитываем."""
+    return slugify(title)
+
+
+def numbered_prefix(slug, max_length):
+    return f'{slug[:max_length - SUFFIX_LENGTH]}-'
+
+
+def numbered_range(prefix):
+    """
+    Условие на slug вида «prefix-число».
+
+    Диапазон выбирает строки по индексу, а регулярное выражение
+    отбрасывает из них соседей вроде «prefix-2-plan».
+    """
+    # ':' идёт в ASCII сразу после '9'.
+    return Q(
+        slug__gt=prefix,
+        slug__lt=f'{prefix[:-1]}-:',
+        slug__regex=rf'^{re.escape(prefix)}\d+$',
+    )
+
+
+def allocate_slug(model, title, exclude_pk=None):
+    """
+    Свободный slug для заголовка: «title», затем «title-2», «title-3»...
+
+    Последний выданный номер хранится в кеше. Обычно хватает одного
+    запроса по уникальному индексу: свободен ли сам slug или следующий
+    номер. Если нет, занятые номера ищутся одним запросом по диапазону
+    индекса, и база сразу возвращает наибольший из них.
+    """
+    max_length = model._meta.get_field('slug').max_length
+    slug = transliterate(title)[:max_length] or DEFAULT_SLUG
+    prefix = numbered_prefix(slug, max_length)
+    taken = model.objects.all()
+    if exclude_pk is not None:
+        taken = taken.exclude(pk=exclude_pk)
+
+    key = LAST_NUMBER_KEY.format(prefix=prefix)
+    last_number = cache.get(key)
+    if last_number is not None:
+        candidates = (slug, f'{prefix}{last_number + 1}')
+        busy = set(
+            taken.filter(slug__in=candidates).values_list('slug', flat=True)
+        )
+        free = [candidate for candidate in candidates if candidate not in busy]
+        if free:
+            if free[0] != slug:
+                cache.set(key, last_number + 1, LAST_NUMBER_TIMEOUT)
+            return free[0]
+
+    numbered = numbered_range(prefix)
+    result = taken.filter(Q(slug=slug) | numbered).aggregate(
+        slug_taken=Count('pk', filter=Q(slug=slug)),
+        last_number=Max(
+            Cast(Substr('slug', len(prefix) + 1), IntegerField()),
+            filter=numbered,
+        ),
+    )
+    if not result['slug_taken']:
+        return slug
+    number = max(result['last_number'] or 1, 1) + 1
+    cache.set(key, number, LAST_NUMBER_TIMEOUT)
+    return f'{prefix}{number}'
+
+
+def last_numbers_by_prefix(model, prefixes):
+    """Наибольшие занятые номера сразу для нескольких префиксов."""
+    result = model.objects.filter(
+        reduce(or_, map(numbered_range, prefixes))
+    ).aggregate(**{
+        str(position): Max(
+            Cast(Substr('slug', len(prefix) + 1), IntegerField()),
+            filter=numbered_range(prefix),
+        )
+        for position, prefix in enumerate(prefixes)
+    })
+    return {
+        prefix: max(result[str(position)] or 1, 1)
+        for position, prefix in enumerate(prefixes)
+    }
+
+
+def allocate_slugs(model, requested):
+    """
+    Свободные slug для пачки новых заметок.
+
+    requested — пары (заголовок, slug), slug может быть пустым. Заданный
+    slug сохраняется, если он свободен, иначе к нему, как и к slug из
+    заголовка, добавляется номер. Для пачки проверяется, заняты ли сами
+    slug, затем свободны ли номера после последних выданных, и только
+    для остальных префиксов ищутся наибольшие занятые номера — одним
+    запросом на PREFIXES_PER_QUERY префиксов.
+    """
+    max_length = model._meta.get_field('slug').max_length
+    wanted = [
+        slug or transliterate(title)[:max_length] or DEFAULT_SLUG
+        for title, slug in requested
+    ]
+    used = set(
+        model.objects.filter(slug__in=set(wanted))
+        .values_list('slug', flat=True)
+    )
+    slugs = [None] * len(wanted)
+    repeated = Counter()
+    for index, slug in enumerate(wanted):
+        if slug in used:
+            repeated[numbered_prefix(slug, max_length)] += 1
+        else:
+            used.add(slug)
+            slugs[index] = slug
+    if not repeated:
+        return slugs
+
+    keys = {
+        prefix: LAST_NUMBER_KEY.format(prefix=prefix) for prefix in repeated
+    }
+    hints = cache.get_many(keys.values())
+    last_numbers = {
+        prefix: hints[key] for prefix, key in keys.items() if key in hints
+    }
+    candidates = {
+        f'{prefix}{number}': prefix
+        for prefix, last_number in last_numbers.items()
+        for number in range(
+            last_number + 1, last_number + repeated[prefix] + 1
+        )
+    }
+    busy = {
+        candidates[slug]
+        for slug in model.objects.filter(slug__in=candidates)
+        .values_list('slug', flat=True)
+    } if candidates else set()
+    unknown = [
+        prefix for prefix in repeated
+        if prefix not in last_numbers or prefix in busy
+    ]
+    for start in range(0, len(unknown), PREFIXES_PER_QUERY):
+        last_numbers.update(last_numbers_by_prefix(
+            model, unknown[start:start + PREFIXES_PER_QUERY]
+        ))
+
+    for index, slug in enumerate(wanted):
+        if slugs[index] is not None:
+            continue
+        prefix = numbered_prefix(slug, max_length)
+        number = last_numbers[prefix] + 1
+        while f'{prefix}{number}' in used:
+            number += 1
+        last_numbers[prefix] = number
+        used.add(f'{prefix}{number}')
+        slugs[index] = f'{prefix}{number}'
+    cache.set_many(
+        {keys[prefix]: number for prefix, number in last_numbers.items()},
+        LAST_NUMBER_TIMEOUT,
+    )
+    return slugs
@@ -1,13 +1,22 @@
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
 User = get_user_model()
 
 
+@override_settings(NOTES_NPLUSONE_MAX_REPEATS=3, NOTES_NPLUSONE_RAISE=True)
 class BaseTestCase(TestCase):
-    """Базовый класс для всех тестов с общими данными."""
+    """
+    Базовый класс для всех тестов с общими данными.
+
+    Запрос N+1 в любом представлении роняет тест.
+    """
 
     @classmethod
     def setUpTestData(cls):
         cls.author = User.objects.create(username='Автор')
         cls.reader = User.objects.create(username='Читатель')
+
+    def setUp(self):
+        cache.clear()
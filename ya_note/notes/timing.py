@@ -0,0 +1,150 @@
+import logging
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger('notes.timing')
+
+# Замеры запроса, который сейчас обрабатывается, если он попал в выборку.
+current_timings = ContextVar('notes_timings', default=None)
+
+
+class RequestTimings:
+    """Время запроса по частям: база данных, шаблоны и кеш."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+        self.template_started = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def time_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db += time.perf_counter() - started
+
+    def finish_render(self, response):
+        self.template += time.perf_counter() - self.template_started
+
+    def as_header(self):
+        return ', '.join((
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} SQL"',
+            f'tpl;dur={self.template * 1000:.1f}',
+            f'cache;desc="hit={self.cache_hits} miss={self.cache_misses}"',
+            f'total;dur={self.total * 1000:.1f}',
+        ))
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db * 1000, 1),
+            'template_ms': round(self.template * 1000, 1),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'total_ms': round(self.total * 1000, 1),
+        }
+
+
+def time_query(execute, sql, params, many, context):
+    """
+    Обёртка execute, её вызывает instrumentation.observe_query.
+
+    Учитывает запрос в замерах текущего запроса, если он попал
+    в выборку, иначе сразу передаёт его дальше.
+    """
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings.time_query(execute, sql, params, many, context)
+
+
+def record_cache(hit):
+    """Учитывает обращение к кешу в замерах текущего запроса."""
+    timings = current_timings.get()
+    if timings is None:
+        return
+    if hit:
+        timings.cache_hits += 1
+    else:
+        timings.cache_misses += 1
+
+
+class ServerTimingMiddleware:
+    """
+    Замеряет долю запросов и отдаёт время в заголовке Server-Timing.
+
+    Доля задаётся NOTES_TIMING_SAMPLE_RATE, остальные запросы проходят
+    без накладных расходов. Та же сводка пишется в журнал notes.timing
+    с именем маршрута. Middleware ставится первым в MIDDLEWARE: тогда
+    его process_template_response вызывается прямо перед отрисовкой.
+
+    Запросы к базе считает time_query, а не обёртка соединения этого
+    потока: под ASGI представления ходят в базу из других потоков,
+    а замеры доходят до них через current_timings.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings)
+
+    def sampled(self):
+        return random.random() < settings.NOTES_TIMING_SAMPLE_RATE
+
+    def process_template_response(self, request, response):
+        timings = current_timings.get()
+        if timings is not None:
+            timings.template_started = time.perf_counter()
+            response.add_post_render_callback(timings.finish_render)
+        return response
+
+    def finish(self, request, response, timings):
+        timings.total = time.perf_counter() - timings.started
+        response['Server-Timing'] = timings.as_header()
+        match = request.resolver_match
+        route = match.view_name if match else '-'
+        values = timings.as_dict()
+        logger.info(
+            '%s %s %s',
+            route,
+            response.status_code,
+            ' '.join(f'{name}={value}' for name, value in values.items()),
+            extra={'route': route, 'status': response.status_code, **values},
+        )
+        return response
@@ -0,0 +1,139 @@
+import codecs
+import csv
+import json
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from .cache import bump_user_version
+from .fields import decompress
+from .models import SLUG_ATTEMPTS, Note
+from .search import index_notes
+from .slugs import allocate_slugs
+
+FIELDS = ('title', 'text', 'slug')
+FORMATS = {
+    'jsonl': 'application/jsonl',
+    'csv': 'text/csv',
+}
+
+
+def read_jsonl(lines):
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise ValidationError(f'Строка {number}: неправильный JSON.')
+        if not isinstance(record, dict):
+            raise ValidationError(f'Строка {number}: ожидается объект.')
+        yield number, record
+
+
+def read_csv(lines):
+    reader = csv.DictReader(lines)
+    for record in reader:
+        yield reader.line_num, record
+
+
+READERS = {
+    'jsonl': read_jsonl,
+    'csv': read_csv,
+}
+
+
+def parse_notes(upload, file_format, author):
+    """
+    Читает файл построчно и отдаёт непроверенные по slug заметки.
+
+    Файл не загружается в память целиком: строки декодируются по мере
+    чтения загруженного файла.
+    """
+    lines = codecs.iterdecode(upload, 'utf-8-sig')
+    try:
+        for number, record in READERS[file_format](lines):
+            note = Note(
+                title=record.get('title') or '',
+                text=record.get('text') or '',
+                slug=record.get('slug') or '',
+                author=author,
+            )
+            try:
+                note.clean_fields(exclude=('author',))
+            except ValidationError as error:
+                messages = '; '.join(
+                    f'{field}: {" ".join(field_errors)}'
+                    for field, field_errors in error.message_dict.items()
+                )
+                raise ValidationError(f'Строка {number}: {messages}')
+            yield note
+    except (UnicodeDecodeError, csv.Error):
+        raise ValidationError('Файл не удалось прочитать.')
+
+
+def import_notes(upload, file_format, author, batch_size):
+    """
+    Добавляет заметки из файла пачками через bulk_create.
+
+    Импорт целиком выполняется в одной транзакции: при ошибке в любой
+    строке не сохраняется ни одна заметка. Если slug, подобранный для
+    пачки, успел занять другой запрос, пачка подбирается и вставляется
+    заново.
+    """
+    notes = parse_notes(upload, file_format, author)
+    imported = 0
+    with transaction.atomic():
+        while batch := list(islice(notes, batch_size)):
+            requested = [(note.title, note.slug) for note in batch]
+            for attempt in range(SLUG_ATTEMPTS):
+                slugs = allocate_slugs(Note, requested)
+                for note, slug in zip(batch, slugs):
+                    note.slug = slug
+                try:
+                    with transaction.atomic():
+                        Note.objects.bulk_create(batch)
+                    break
+                except IntegrityError:
+                    if attempt == SLUG_ATTEMPTS - 1:
+                        raise
+            # bulk_create не отправляет сигналов, индекс дополняем сами.
+            index_notes(batch)
+            imported += len(batch)
+        transaction.on_commit(lambda: bump_user_version(author.pk))
+    return imported
+
+
+class Echo:
+    """Файлоподобный объект, который возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def export_notes(author, file_format, chunk_size):
+    """
+    Строки файла с заметками автора, по одной на заметку.
+
+    Заметки читаются из базы порциями по chunk_size, так что память
+    не зависит от числа заметок. values_list отдаёт сжатый текст
+    как есть, поэтому он распаковывается здесь.
+    """
+    notes = (
+        (title, decompress(text), slug)
+        for title, text, slug in Note.objects.filter(author=author)
+        .order_by('id')
+        .values_list(*FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    if file_format == 'jsonl':
+        for values in notes:
+            yield json.dumps(
+                dict(zip(FIELDS, values)), ensure_ascii=False
+            ) + '\n'
+        return
+    writer = csv.writer(Echo())
+    yield writer.writerow(FIELDS)
+    for values in notes:
+        yield writer.writerow(values)
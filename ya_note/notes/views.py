@@ -1,9 +1,19 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.http import Http404, StreamingHttpResponse
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views import generic
 
-from .forms import NoteForm
+from .cache import cache_user_page
+from .forms import NoteForm, NoteImportForm
 from .models import Note
+from .pagination import KeysetPaginator
+from .search import search_notes
+from .throttling import ThrottleMixin
+from .transfer import FORMATS, export_notes, import_notes
 
 
 class Home(generic.TemplateView):
@@ -26,19 +36,36 @@ class NoteBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
-class NoteCreate(NoteBase, generic.CreateView):
+class NoteSaveMixin:
+    """Занятый slug показывается ошибкой формы, а не ошибкой сервера."""
+
+    def form_valid(self, form):
+        slug = form.cleaned_data['slug']
+        try:
+            with transaction.atomic():
+                return super().form_valid(form)
+        except IntegrityError:
+            # Пустой slug Note.save() подбирает сам и при конфликте
+            # повторяет попытку, так что здесь это чужая ошибка.
+            if not slug:
+                raise
+            form.add_slug_error()
+            return self.form_invalid(form)
+
+
+class NoteCreate(NoteBase, NoteSaveMixin, ThrottleMixin, generic.CreateView):
     """Добавление заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
+    throttle_scope = 'note'
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        """Заметка сохраняется один раз, в ModelFormMixin.form_valid."""
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteUpdate(NoteBase, NoteSaveMixin, generic.UpdateView):
     """Редактирование заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
@@ -49,11 +76,82 @@ class NoteDelete(NoteBase, generic.DeleteView):
     template_name = 'notes/delete.html'
 
 
+@method_decorator(cache_user_page, name='get')
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+    """
+    Список всех заметок пользователя.
+
+    Страницы листаются курсором по индексу (author, id), а текст
+    заметок, которого нет в списке, не загружается.
+    """
     template_name = 'notes/list.html'
+    ordering = ('id',)
+
+    def get_queryset(self):
+        return super().get_queryset().only('id', 'slug', 'title')
 
+    def get_paginate_by(self, queryset):
+        return settings.NOTES_COUNT_ON_LIST_PAGE
 
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size)
+        page = paginator.get_page(self.request.GET.get('after'))
+        return paginator, page, page.object_list, page.has_next()
+
+
+@method_decorator(cache_user_page, name='get')
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+
+class NoteSearch(LoginRequiredMixin, generic.TemplateView):
+    """Полнотекстовый поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '')
+        context['query'] = query
+        context['object_list'] = search_notes(
+            self.request.user, query, settings.NOTES_SEARCH_RESULTS
+        )
+        return context
+
+
+class NoteImport(NoteBase, ThrottleMixin, generic.FormView):
+    """Загрузка заметок из файла."""
+    template_name = 'notes/import.html'
+    form_class = NoteImportForm
+    throttle_scope = 'import'
+
+    def form_valid(self, form):
+        try:
+            import_notes(
+                form.cleaned_data['file'],
+                form.cleaned_data['format'],
+                self.request.user,
+                settings.NOTES_IMPORT_BATCH_SIZE,
+            )
+        except ValidationError as error:
+            form.add_error('file', error)
+            return self.form_invalid(form)
+        return super().form_valid(form)
+
+
+class NoteExport(NoteBase, generic.View):
+    """Выгрузка всех заметок пользователя в файл."""
+
+    def get(self, request, file_format):
+        if file_format not in FORMATS:
+            raise Http404('Неизвестный формат выгрузки.')
+        response = StreamingHttpResponse(
+            export_notes(
+                request.user, file_format, settings.NOTES_EXPORT_CHUNK_SIZE
+            ),
+            content_type=f'{FORMATS[file_format]}; charset=utf-8',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="notes.{file_format}"'
+        )
+        return response
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -22,6 +23,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'notes.slow_queries.SlowQueryMiddleware',
+    'notes.nplusone.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -52,10 +55,47 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
+# Настройки каждого соединения с SQLite. В режиме WAL читатели не ждут
+# пишущего, а synchronous=NORMAL в этом режиме не портит базу при сбое,
+# лишь может потерять последние транзакции. Размеры — в байтах,
+# cache_size со знаком минус — в КиБ.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение переживает запрос, а перед повторным
+        # использованием проверяется.
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Транзакция берёт блокировку записи сразу. Иначе две
+            # транзакции, начавшие с чтения, не могут обе перейти
+            # к записи, и одна падает с «database is locked», не
+            # дожидаясь timeout.
+            'transaction_mode': 'IMMEDIATE',
+            # Сколько секунд ждать чужую блокировку (busy_timeout).
+            'timeout': 20,
+            'init_command': ';'.join(
+                f'PRAGMA {name} = {value}'
+                for name, value in SQLITE_PRAGMAS.items()
+            ),
+        },
+    }
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        # Страницы заметок кешируются отдельно для каждого пользователя.
+        'OPTIONS': {'MAX_ENTRIES': 10_000},
     }
 }
 
@@ -87,3 +127,76 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_COUNT_ON_LIST_PAGE = 50
+
+NOTES_PAGE_CACHE_TIMEOUT = 60 * 60
+
+NOTES_SEARCH_RESULTS = 50
+
+NOTES_IMPORT_BATCH_SIZE = 500
+
+NOTES_EXPORT_CHUNK_SIZE = 2000
+
+# Частоты записи по областям: ёмкость ведра токенов и время,
+# за которое оно наполняется, отдельно для пользователя и адреса.
+NOTES_THROTTLE_RATES = {
+    'note': {'user': '30/min', 'ip': '120/min'},
+    'import': {'user': '5/h', 'ip': '20/h'},
+}
+
+# Заголовок Server-Timing и строка в журнале notes.timing для доли
+# запросов. Включаются переменной окружения NOTES_SERVER_TIMING.
+if os.environ.get('NOTES_SERVER_TIMING') == '1':
+    MIDDLEWARE.insert(0, 'notes.timing.ServerTimingMiddleware')
+
+NOTES_TIMING_SAMPLE_RATE = float(
+    os.environ.get('NOTES_TIMING_SAMPLE_RATE', 0.01)
+)
+
+# Запросы к базе дольше порога в миллисекундах пишутся
+# в slow_queries.log с маршрутом и строкой шаблона или кода.
+# Порог задаёт переменная окружения NOTES_SLOW_QUERY_MS,
+# без неё (None) запись отключена.
+NOTES_SLOW_QUERY_MS = (
+    float(os.environ['NOTES_SLOW_QUERY_MS'])
+    if os.environ.get('NOTES_SLOW_QUERY_MS') else None
+)
+
+# Каталог журналов, задаётся переменной окружения NOTES_LOG_DIR.
+LOG_DIR = Path(os.environ.get('NOTES_LOG_DIR', BASE_DIR))
+
+# Сколько самых медленных запросов помнить для каждого маршрута.
+NOTES_SLOW_QUERY_TOP = 10
+
+# Сколько раз один и тот же SELECT может выполниться за запрос,
+# прежде чем считаться N+1. В отладке повторы пишутся в журнал
+# notes.nplusone, в тестах ещё и роняют тест. None отключает поиск.
+NOTES_NPLUSONE_MAX_REPEATS = 3 if DEBUG else None
+
+NOTES_NPLUSONE_RAISE = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': LOG_DIR / 'slow_queries.log',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'notes.timing': {'handlers': ['console'], 'level': 'INFO'},
+        'notes.nplusone': {'handlers': ['console'], 'level': 'WARNING'},
+        'notes.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}